@@ -28,11 +28,15 @@ Usage:
 
 import argparse
 import datetime as dt
+import functools
 import json
 import logging
 import os
 import re
 import sys
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
@@ -81,10 +85,13 @@ except Exception:
         CREDENTIALS_DIR = LEGACY_CONFIG_DIR
 
 CALENDAR_ID = "primary"
+CALENDAR_BATCH_SIZE = 50  # max requests per Calendar batch HTTP call
 DRIVE_FOLDER_NAME = "Court Visitor ARP Documents"  # Google Drive folder for ARP files
+DRIVE_UPLOAD_WORKERS = 8  # concurrent ARP/ORDER uploads
 TZ_NAME = "America/Chicago"
 EVENT_DURATION_MIN = 60
 REMINDERS_MINUTES = [24 * 60, 2 * 60]  # 24h, 2h
+_TZ = ZoneInfo(TZ_NAME)
 
 # Excel column names in your sheet
 COL_CAUSENO = "causeno"
@@ -104,9 +111,35 @@ COL_G2_PHONE = "g2tele"
 COL_APPT_CONFIRMED = "Appt_confirmed"  # check this column
 COL_CALENDARED = "Calendared"  # mark this column
 
+# Columns this script reads, in the order main() unpacks them from each row
+ROW_COLUMNS = [
+    COL_CAUSENO, COL_VISITDATE, COL_VISITTIME, COL_WADDRESS, COL_WARDFIRST, COL_WARDLAST,
+    COL_G1_EMAIL, COL_G2_EMAIL_PRIMARY, COL_G2_EMAIL_TYPO, COL_APPT_CONFIRMED, COL_CALENDARED,
+]
+USED_COLUMNS = frozenset(ROW_COLUMNS)
+COL_START_DT = "__start_dt"  # added by annotate_datetimes(), never written back
+
 # Minimal Google API scopes for events only
 SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
 
+# Pulls the cause number back out of an event title built by build_event()
+_SUMMARY_CAUSE_RE = re.compile(r"Cause\s+(\S+)\s*$")
+
+# Time cell parsing: "9", "930", "9:30", "9:30pm", ...
+_TIME_RE = re.compile(r"(\d{1,2})(?::?(\d{2}))?(am|pm)?")
+# Column-wide variant for annotate_datetimes(); also accepts seconds ("09:30:00")
+_TIME_COLUMN_RE = re.compile(r"^(?P<hh>\d{1,2})(?::?(?P<mm>\d{2}))?(?::(?P<ss>\d{2}))?(?P<ampm>am|pm)?$")
+_NULL_TOKENS = frozenset({"tbd", "na", "n/a", "none", ""})
+
+# Email cells treated as missing
+_BLANK_EMAIL_TOKENS = frozenset({"", "nan", "none", "n/a", "na", "null", "nil"})
+
+# Excel serial day 0 (same epoch pandas uses for origin="1899-12-30")
+_EXCEL_EPOCH = dt.datetime(1899, 12, 30)
+
+# Standardized case-file names: *_ARP.pdf / *_ORDER.pdf (matched lowercased)
+_ARP_ORDER_SUFFIX_RE = re.compile(r"_(?:(?P<arp>arp)|(?P<order>order))\.pdf$")
+
 # ------------------------------
 # Logging
 # ------------------------------
@@ -193,38 +226,46 @@ def get_calendar_service() -> any:
         with open(token_path, "w", encoding="utf-8") as f:
             f.write(creds.to_json())
             logging.info(f"Saved calendar token: {token_path}")
-    # cache_discovery=False silences the oauth2client cache warning
-    service = build("calendar", "v3", credentials=creds, cache_discovery=False)
+    # static_discovery uses the discovery doc bundled with google-api-python-client
+    # (no HTTP fetch); cache_discovery=False silences the oauth2client cache warning
+    service = build("calendar", "v3", credentials=creds, cache_discovery=False, static_discovery=True)
     return service
 
 
 def read_workbook(path: str) -> pd.DataFrame:
-    df = pd.read_excel(path, engine="openpyxl")
+    # Only parse the columns this script reads
+    df = pd.read_excel(path, engine="openpyxl", usecols=lambda c: str(c).strip() in USED_COLUMNS)
     df.columns = [c.strip() for c in df.columns]
+    return normalize_email_columns(df)
+
+
+def normalize_email_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Strip the guardian email columns and blank out placeholders ('none', 'n/a', ...)
+    and values without '@' in one vectorized pass, instead of per row.
+    """
+    for col in (COL_G1_EMAIL, COL_G2_EMAIL_PRIMARY, COL_G2_EMAIL_TYPO):
+        if col not in df.columns:
+            continue
+        s = df[col].astype("string").str.strip()
+        bad = s.str.lower().isin(_BLANK_EMAIL_TOKENS) | ~s.str.contains("@", na=False)
+        df[col] = s.mask(bad)
     return df
 
 
-def coalesce_g2_email(row: pd.Series) -> str | None:
-    """Guardian2 email lives in g2eamil/g2email; normalize; treat 'none' as missing."""
-    val = None
-    if COL_G2_EMAIL_PRIMARY in row.index and pd.notna(row[COL_G2_EMAIL_PRIMARY]):
-        val = str(row[COL_G2_EMAIL_PRIMARY]).strip()
-    if (not val) and (COL_G2_EMAIL_TYPO in row.index) and pd.notna(row[COL_G2_EMAIL_TYPO]):
-        val = str(row[COL_G2_EMAIL_TYPO]).strip()
-    if not val:
-        return None
-    if val.lower() in {"none", "n/a", "na", "null", "nil"} or "@" not in val:
-        return None
-    return val
+def coalesce_g2_email(primary, typo) -> str | None:
+    """Guardian2 email lives in g2email/g2eamil (already normalized by normalize_email_columns)."""
+    for val in (primary, typo):
+        if pd.notna(val):
+            return str(val)
+    return None
 
 
 def clean_email(s: str | None) -> str | None:
-    if not s:
-        return None
-    s = str(s).strip()
-    if not s or s.lower() in {"none", "n/a", "na", "null", "nil"} or "@" not in s:
+    """Email cell from a normalized column -> str, or None when blank."""
+    if s is None or pd.isna(s):
         return None
-    return s
+    return str(s)
 
 
 def pick_attendees(g1_email: str | None, g2_email: str | None) -> list[dict]:
@@ -237,23 +278,32 @@ def pick_attendees(g1_email: str | None, g2_email: str | None) -> list[dict]:
 
 
 # ---- Robust date/time parsing ----
+def _has_digit(s: str) -> bool:
+    return any(c.isdigit() for c in s)
+
+
 def parse_date_cell(d):
     """Return a date object from mixed Excel/Pandas/string inputs."""
+    # Fast path: openpyxl/pandas usually hand us these exact types already
+    tp = type(d)
+    if tp is pd.Timestamp or tp is dt.datetime:
+        return d.date()
+    if tp is dt.date:
+        return d
     if pd.isna(d):
         return None
-    if isinstance(d, pd.Timestamp):
-        return d.date()
     if isinstance(d, dt.datetime):
         return d.date()
     if isinstance(d, dt.date):
         return d
     if isinstance(d, (int, float)):
         try:
-            return pd.to_datetime(d, unit="d", origin="1899-12-30").date()
-        except Exception:
+            return (_EXCEL_EPOCH + dt.timedelta(days=d)).date()
+        except (OverflowError, ValueError):
             pass
     s = str(d).strip()
-    if not s:
+    # Only hand strings that could be a date to pandas ("TBD", "none", ...)
+    if not _has_digit(s):
         return None
     dt_obj = pd.to_datetime(s, errors="coerce", dayfirst=False)
     if pd.isna(dt_obj):
@@ -263,24 +313,28 @@ def parse_date_cell(d):
 
 def parse_time_cell(t):
     """Return a time object from mixed Excel/Pandas/string/serial inputs."""
+    # Fast path: openpyxl/pandas usually hand us these exact types already
+    tp = type(t)
+    if tp is dt.time:
+        return t
+    if tp is pd.Timestamp or tp is dt.datetime:
+        return t.time()
     if pd.isna(t):
         return None
-    if isinstance(t, pd.Timestamp):
-        return t.time()
     if isinstance(t, dt.datetime):
         return t.time()
     if isinstance(t, dt.time):
         return t
     if isinstance(t, (int, float)):
         try:
-            return pd.to_datetime(t, unit="d", origin="1899-12-30").time()
-        except Exception:
+            return (_EXCEL_EPOCH + dt.timedelta(days=t)).time()
+        except (OverflowError, ValueError):
             pass
     s = str(t).strip().lower()
-    if not s or s in {"tbd", "na", "n/a", "none"}:
+    if s in _NULL_TOKENS:
         return None
     s = s.replace(" ", "").replace(".", ":")
-    m = re.fullmatch(r"(\d{1,2})(?::?(\d{2}))?(am|pm)?", s)
+    m = _TIME_RE.fullmatch(s)
     if m:
         hh = int(m.group(1))
         mm = int(m.group(2) or 0)
@@ -291,6 +345,10 @@ def parse_time_cell(t):
             hh = 0
         if 0 <= hh <= 23 and 0 <= mm <= 59:
             return dt.time(hour=hh, minute=mm)
+        return None
+    # Skip the slow pandas fallback for strings that cannot be a time
+    if not _has_digit(s):
+        return None
     parsed = pd.to_datetime(str(t), errors="coerce")
     if pd.isna(parsed):
         return None
@@ -304,63 +362,107 @@ def combine_date_time_local(d, t, tzname: str) -> dt.datetime | None:
     if not date_part or not time_part:
         logging.info(f"DEBUG: raw visit cells -> visitdate={d!r}, visittime={t!r}; parsed date={date_part!r} time={time_part!r}")
         return None
-    z = ZoneInfo(tzname)
+    z = _TZ if tzname == TZ_NAME else ZoneInfo(tzname)
     return dt.datetime.combine(date_part, time_part).replace(tzinfo=z)
 
 
-def row_is_eligible(row: pd.Series, now_local: dt.datetime) -> tuple[bool, str]:
+def annotate_datetimes(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parse visitdate/visittime for every row once, up front, into COL_START_DT
+    (tz-aware datetime, or None when missing/invalid).
+
+    Datetime cells and "9:30 pm"-style time text are handled with vectorized
+    pandas ops; any row those can't read (Excel serials, odd text) falls back to
+    combine_date_time_local so results match the per-cell parsers.
+    """
+    dates = frame[COL_VISITDATE]
+    times = frame[COL_VISITTIME]
+
+    # Dates: numeric cells are Excel serials, which pd.to_datetime would misread
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        day = dates.dt.normalize()
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # "could not infer format" on mixed text
+            day = pd.to_datetime(dates.where(pd.to_numeric(dates, errors="coerce").isna()), errors="coerce")
+        day = day.dt.normalize()
+
+    # Times: one regex extract over the column ("9", "930", "9:30", "09:30:00", "9:30pm")
+    if pd.api.types.is_datetime64_any_dtype(times):
+        offset = times - times.dt.normalize()
+    else:
+        text = times.where(pd.to_numeric(times, errors="coerce").isna()).astype(str)
+        text = text.str.strip().str.lower().str.replace(" ", "", regex=False).str.replace(".", ":", regex=False)
+        parts = text.str.extract(_TIME_COLUMN_RE)
+        hh = pd.to_numeric(parts["hh"], errors="coerce")
+        mm = pd.to_numeric(parts["mm"], errors="coerce").fillna(0)
+        ss = pd.to_numeric(parts["ss"], errors="coerce").fillna(0)
+        hh = hh.mask((parts["ampm"] == "pm") & (hh < 12), hh + 12)
+        hh = hh.mask((parts["ampm"] == "am") & (hh == 12), 0)
+        valid = hh.between(0, 23) & mm.between(0, 59)
+        offset = pd.to_timedelta((hh * 3600 + mm * 60 + ss).where(valid), unit="s")
+
+    # DST-ambiguous/nonexistent times become NaT and take the per-cell path below
+    start = (day + offset).dt.tz_localize(TZ_NAME, ambiguous="NaT", nonexistent="NaT")
+
+    start_dts = []
+    for ts, d, t in zip(start, dates, times):
+        if not pd.isna(ts):
+            start_dts.append(ts.to_pydatetime())
+        elif pd.isna(d) and pd.isna(t):
+            start_dts.append(None)
+        else:
+            start_dts.append(combine_date_time_local(d, t, TZ_NAME))
+    # object dtype keeps None (not NaT) for rows without a usable date/time
+    frame[COL_START_DT] = pd.Series(start_dts, index=frame.index, dtype=object)
+    return frame
+
+
+def row_is_eligible(appt_confirmed, calendared, start_dt: dt.datetime | None,
+                    now_local: dt.datetime) -> tuple[bool, str, dt.datetime | None]:
     """
     Eligibility for live mode:
      - Appt_confirmed=Y (appointment confirmed)
      - Calendared blank (not yet calendared)
      - visitdate & visittime present
      - datetime >= now + 15 min
+    Flag arguments come from columns pre-normalized (stripped, upper-cased,
+    blank for missing) by main(); start_dt comes from annotate_datetimes().
+    Returns (ok, reason, start_dt).
     """
     # Must have confirmed appointment first
-    appt_val = str(row.get(COL_APPT_CONFIRMED, "")).strip() if COL_APPT_CONFIRMED in row.index else ""
-    if appt_val.upper() != "Y":
-        return False, "Appt_confirmed not Y"
-    
+    if appt_confirmed != "Y":
+        return False, "Appt_confirmed not Y", None
+
     # Must not already be calendared
-    cal_val = str(row.get(COL_CALENDARED, "")).strip() if COL_CALENDARED in row.index else ""
-    if cal_val.upper() == "Y":
-        return False, "Calendared=Y"
+    if calendared == "Y":
+        return False, "Calendared=Y", None
 
-    start_dt = combine_date_time_local(row.get(COL_VISITDATE), row.get(COL_VISITTIME), TZ_NAME)
     if not start_dt:
-        return False, "Missing/invalid visitdate/visittime"
+        return False, "Missing/invalid visitdate/visittime", None
 
     if start_dt < now_local + dt.timedelta(minutes=15):
-        return False, "Start < now+15min"
-
-    return True, ""
+        return False, "Start < now+15min", start_dt
 
+    return True, "", start_dt
 
-def build_event(row: pd.Series) -> dict:
-    ward_first = str(row.get(COL_WARDFIRST, "") or "").strip()
-    ward_last = str(row.get(COL_WARDLAST, "") or "").strip()
-    causeno = str(row.get(COL_CAUSENO, "") or "").strip()
-    waddress = str(row.get(COL_WADDRESS, "") or "").strip()
 
-    start_dt = combine_date_time_local(row.get(COL_VISITDATE), row.get(COL_VISITTIME), TZ_NAME)
+def build_event(causeno: str, ward_first: str, ward_last: str, waddress: str,
+                start_dt: dt.datetime) -> dict:
+    """Event body for one visit; text arguments are already stripped."""
     if not start_dt:
         raise ValueError("Invalid start datetime")
 
     end_dt = start_dt + dt.timedelta(minutes=EVENT_DURATION_MIN)
 
     title = f"Court Visit — {ward_last}, {ward_first} — Cause {causeno}".strip(" —")
-    description_lines = [
-        f"Visit regarding {ward_first} {ward_last} (Cause {causeno}).",
-        "Created by automation.",
-    ]
-    description = "\n".join([ln for ln in description_lines if ln])
+    description = f"Visit regarding {ward_first} {ward_last} (Cause {causeno}).\nCreated by automation."
 
     event = {
         "summary": title,
         "description": description,
         "start": {"dateTime": start_dt.isoformat(), "timeZone": TZ_NAME},
         "end": {"dateTime": end_dt.isoformat(), "timeZone": TZ_NAME},
-        "location": waddress or None,
         "guestsCanInviteOthers": False,
         "guestsCanModify": False,
         "guestsCanSeeOtherGuests": True,
@@ -369,19 +471,25 @@ def build_event(row: pd.Series) -> dict:
             "overrides": [{"method": "popup", "minutes": m} for m in REMINDERS_MINUTES],
         },
     }
-    return {k: v for k, v in event.items() if v not in (None, "", [])}
+    if waddress:
+        event["location"] = waddress
+    return event
+
+
+@functools.lru_cache(maxsize=8)
+def _list_case_folders(base_folder: str) -> tuple[tuple[str, Path], ...]:
+    """(lowercased name, path) for each subfolder of base_folder; listed once per run."""
+    if not os.path.isdir(base_folder):
+        return ()
+    # scandir's DirEntry.is_dir() uses the cached directory entry type (no stat per entry)
+    with os.scandir(base_folder) as it:
+        return tuple((e.name.lower(), Path(e.path)) for e in it if e.is_dir())
 
 
 def find_case_folder(base_folder: str, causeno: str) -> Path | None:
     """Find a subfolder whose name contains the causeno (one level deep)."""
-    base = Path(base_folder)
-    if not base.exists():
-        return None
     cn = (causeno or "").lower()
-    for child in base.iterdir():
-        if child.is_dir() and cn in child.name.lower():
-            return child
-    return None
+    return next((child for name, child in _list_case_folders(base_folder) if cn in name), None)
 
 
 def list_arp_order_files(case_folder: Path) -> tuple[list[Path], list[Path]]:
@@ -391,45 +499,70 @@ def list_arp_order_files(case_folder: Path) -> tuple[list[Path], list[Path]]:
     arp, order = [], []
     if not case_folder or not case_folder.exists():
         return arp, order
-    for p in case_folder.glob("*.pdf"):
+    for p in case_folder.iterdir():
         name = p.name.lower()
+        if not name.endswith(".pdf"):
+            continue
         # Look for standardized naming pattern: *_ARP.pdf, *_ORDER.pdf
-        if name.endswith("_arp.pdf") or re.search(r"_arp\.pdf$", name):
-            arp.append(p)
-        elif name.endswith("_order.pdf") or re.search(r"_order\.pdf$", name):
-            order.append(p)
+        m = _ARP_ORDER_SUFFIX_RE.search(name)
+        if m:
+            (arp if m.group("arp") else order).append(p)
         # Fallback to original patterns for backward compatibility
-        elif re.search(r"\barp(\d+)?\.pdf$", name) or re.search(r"\barp\b", name) or "arp" in name:
+        elif "arp" in name:
             arp.append(p)
-        elif re.search(r"\border(\d+)?\.pdf$", name) or re.search(r"\border\b", name) or "order" in name:
+        elif "order" in name:
             order.append(p)
-    arp.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-    order.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+    if len(arp) > 1:
+        arp.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+    if len(order) > 1:
+        order.sort(key=lambda x: x.stat().st_mtime, reverse=True)
     return arp, order
 
 
-def find_existing_event(service, causeno: str, start_dt: dt.datetime) -> str | None:
-    """Find existing calendar event for this cause number and return event ID if found."""
+def index_existing_events(service, start_dts: list[dt.datetime]) -> dict[tuple[str, dt.date], str]:
+    """
+    Fetch all 'Court Visit' events spanning the given start datetimes in one
+    list query and return {(causeno, local visit date): event_id}.
+    """
+    index = {}
+    if not start_dts:
+        return index
+    time_min = min(start_dts).replace(hour=0, minute=0, second=0, microsecond=0)
+    time_max = max(start_dts).replace(hour=23, minute=59, second=59, microsecond=0)
     try:
-        # Search for events with the cause number in the title
-        events_result = service.events().list(
-            calendarId=CALENDAR_ID,
-            timeMin=start_dt.replace(hour=0, minute=0, second=0).isoformat(),
-            timeMax=start_dt.replace(hour=23, minute=59, second=59).isoformat(),
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        for event in events:
-            summary = event.get('summary', '')
-            if causeno in summary and 'Court Visit' in summary:
-                logging.info(f"Found existing event for cause {causeno}: {event.get('id')}")
-                return event.get('id')
-        return None
+        page_token = None
+        while True:
+            events_result = service.events().list(
+                calendarId=CALENDAR_ID,
+                timeMin=time_min.isoformat(),
+                timeMax=time_max.isoformat(),
+                singleEvents=True,
+                maxResults=2500,
+                pageToken=page_token,
+                fields="items(id,summary,start(dateTime,date)),nextPageToken",
+            ).execute()
+
+            for event in events_result.get('items', []):
+                summary = event.get('summary', '')
+                m = _SUMMARY_CAUSE_RE.search(summary)
+                if not m or 'Court Visit' not in summary:
+                    continue
+                start = event.get('start', {})
+                if start.get('dateTime'):
+                    day = dt.datetime.fromisoformat(start['dateTime']).astimezone(_TZ).date()
+                elif start.get('date'):
+                    day = dt.date.fromisoformat(start['date'])
+                else:
+                    continue
+                index.setdefault((m.group(1), day), event.get('id'))
+
+            page_token = events_result.get('nextPageToken')
+            if not page_token:
+                break
+        logging.info(f"Indexed {len(index)} existing Court Visit event(s) from {time_min.date()} to {time_max.date()}")
     except Exception as e:
         logging.warning(f"Error searching for existing events: {e}")
-        return None
+    return index
 
 
 def delete_existing_event(service, event_id: str, causeno: str) -> bool:
@@ -443,8 +576,8 @@ def delete_existing_event(service, event_id: str, causeno: str) -> bool:
         return False
 
 
-def get_drive_service():
-    """Get authenticated Google Drive service."""
+def get_drive_credentials() -> Credentials:
+    """Load (or obtain via OAuth) Google Drive credentials."""
     SCOPES = ['https://www.googleapis.com/auth/drive.file']
     creds = None
 
@@ -476,7 +609,15 @@ def get_drive_service():
         with open(token_path, 'w') as token:
             token.write(creds.to_json())
 
-    return build('drive', 'v3', credentials=creds)
+    return creds
+
+
+def get_drive_service(creds: Credentials | None = None):
+    """Get authenticated Google Drive service."""
+    if creds is None:
+        creds = get_drive_credentials()
+    # Bundled (static) discovery doc: no discovery HTTP round-trip per build
+    return build('drive', 'v3', credentials=creds, cache_discovery=False, static_discovery=True)
 
 
 def find_or_create_drive_folder(drive_service, folder_name: str) -> str:
@@ -485,7 +626,8 @@ def find_or_create_drive_folder(drive_service, folder_name: str) -> str:
         # Search for existing folder
         results = drive_service.files().list(
             q=f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false",
-            fields="files(id, name)"
+            fields="files(id)",
+            pageSize=1,
         ).execute()
         
         folders = results.get('files', [])
@@ -557,6 +699,120 @@ def upload_order_to_drive(drive_service, order_file_path: Path, causeno: str, fo
         return None
 
 
+def upload_case_files(creds: Credentials, folder_id: str,
+                      jobs: list[tuple[str, Path | None, Path | None]]) -> list[tuple[str | None, str | None]]:
+    """
+    Upload ARP/ORDER files for many causes concurrently.
+    jobs: [(causeno, arp_path, order_path)]; returns [(arp_file_id, order_file_id)] in job order.
+    Each worker thread builds its own Drive service because the underlying
+    httplib2 connection is not thread-safe.
+    """
+    local = threading.local()
+
+    def _upload(upload_fn, path: Path, causeno: str) -> str | None:
+        svc = getattr(local, "service", None)
+        if svc is None:
+            svc = local.service = get_drive_service(creds)
+        return upload_fn(svc, path, causeno, folder_id)
+
+    results = [[None, None] for _ in jobs]
+    with ThreadPoolExecutor(max_workers=DRIVE_UPLOAD_WORKERS) as ex:
+        futures = {}
+        for i, (causeno, arp_path, order_path) in enumerate(jobs):
+            if arp_path:
+                futures[ex.submit(_upload, upload_arp_to_drive, arp_path, causeno)] = (i, 0)
+            if order_path:
+                futures[ex.submit(_upload, upload_order_to_drive, order_path, causeno)] = (i, 1)
+        for fut in as_completed(futures):
+            i, slot = futures[fut]
+            try:
+                results[i][slot] = fut.result()
+            except Exception as e:
+                logging.warning(f"Failed to upload file to Drive for cause {jobs[i][0]}: {e}")
+    return [tuple(r) for r in results]
+
+
+def insert_events_batched(service, events: list[tuple[str, dict]]) -> list[str]:
+    """
+    Insert events CALENDAR_BATCH_SIZE at a time via BatchHttpRequest.
+    events: [(causeno, event_body)]; returns the causes whose insert succeeded.
+    """
+    created_causes = []
+
+    def _on_event_created(request_id, response, exception):
+        causeno = events[int(request_id)][0]
+        if exception is not None:
+            logging.error(f"Failed to create event for cause {causeno}: {exception}")
+            return
+        created_causes.append(causeno)
+        logging.info(f"Created event: {response.get('htmlLink')}")
+
+    for start in range(0, len(events), CALENDAR_BATCH_SIZE):
+        chunk = range(start, min(start + CALENDAR_BATCH_SIZE, len(events)))
+        batch = service.new_batch_http_request(callback=_on_event_created)
+        for i in chunk:
+            batch.add(
+                service.events().insert(
+                    calendarId=CALENDAR_ID, body=events[i][1], sendUpdates="all", supportsAttachments=True,
+                    fields="id,htmlLink",
+                ),
+                request_id=str(i),
+            )
+        try:
+            batch.execute()
+        except Exception as e:
+            logging.exception(f"Failed to create events for causes {[events[i][0] for i in chunk]}: {e}")
+    return created_causes
+
+
+def mark_calendared(excel_path: str, causes: list[str]) -> int:
+    """
+    Mark Calendared = "Y" for every cause in one workbook load/save.
+    Returns the number of rows marked (0 if nothing was written).
+    """
+    if not causes:
+        return 0
+    import openpyxl
+
+    try:
+        wb = openpyxl.load_workbook(excel_path)
+        ws = wb["Sheet1"]
+
+        # causeno is in column 4; index it once so each lookup is O(1).
+        # setdefault keeps the first matching row, as the old per-cause scan did.
+        cause_to_row = {}
+        for r, (value,) in enumerate(ws.iter_rows(min_row=2, min_col=4, max_col=4, values_only=True), start=2):
+            if value is not None:
+                cause_to_row.setdefault(str(value).strip(), r)
+
+        # Find or create Calendared column
+        cal_col = None
+        for col_idx in range(1, ws.max_column + 1):
+            if ws.cell(row=1, column=col_idx).value == COL_CALENDARED:
+                cal_col = col_idx
+                break
+        if cal_col is None:
+            cal_col = ws.max_column + 1
+            ws.cell(row=1, column=cal_col, value=COL_CALENDARED)
+
+        marked = 0
+        for causeno in causes:
+            row_idx = cause_to_row.get(causeno)
+            if row_idx is None:
+                logging.warning(f"Calendared: cause {causeno} not found in workbook")
+                continue
+            ws.cell(row=row_idx, column=cal_col, value="Y")
+            marked += 1
+
+        # Single save; if it fails nothing is written and the workbook is left untouched
+        wb.save(excel_path)
+        logging.info(f"Marked Calendared=Y for {marked} cause(s)")
+        return marked
+    except Exception as excel_error:
+        logging.warning(f"Failed to mark Calendared for causes {causes}: {excel_error}")
+        return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description="Create Google Calendar events from Excel.")
     parser.add_argument("--mode", choices=["test_last_row", "live"], required=True, help="Run mode")
@@ -581,19 +837,25 @@ def main():
         logging.error(f"Missing expected columns: {missing}")
         sys.exit(3)
 
-    # Determine rows to process
+    # Determine rows to process; optional columns missing from the sheet read as NaN
+    frame = df.reindex(columns=ROW_COLUMNS)
+    # Normalize the Y/blank flag columns in one vectorized pass
+    for col in (COL_APPT_CONFIRMED, COL_CALENDARED):
+        frame[col] = frame[col].astype("string").str.strip().str.upper().fillna("")
     if args.mode == "test_last_row":
-        candidates = df[df[[COL_VISITDATE, COL_VISITTIME]].notna().all(axis=1)]
+        candidates = frame[frame[[COL_VISITDATE, COL_VISITTIME]].notna().all(axis=1)]
         if candidates.empty:
             logging.warning("No rows with BOTH visitdate and visittime set. Nothing to test.")
             return
         idx = candidates.index[-1]
-        rows = [df.loc[idx]]
+        frame = frame.loc[[idx]].copy()
         logging.info(f"Test mode: using last row with BOTH date & time index={idx}")
-    else:
-        rows = [r for _, r in df.iterrows()]
+    # Parse every visit date/time once, before any per-row work
+    frame = annotate_datetimes(frame)
+    # Plain tuples in ROW_COLUMNS order: no per-row Series construction or .get() dispatch
+    rows = list(frame.itertuples(index=False, name=None))
 
-    now_local = dt.datetime.now(ZoneInfo(TZ_NAME))
+    now_local = dt.datetime.now(_TZ)
     created = 0
     skipped = 0
 
@@ -602,36 +864,47 @@ def main():
     if not args.dry_run:
         service = get_calendar_service()
 
-    for row in rows:
-        causeno = str(row.get(COL_CAUSENO, "") or "").strip()
-        ward_first = str(row.get(COL_WARDFIRST, "") or "").strip()
-        ward_last = str(row.get(COL_WARDLAST, "") or "").strip()
-
-        if args.mode == "live":
-            ok, reason = row_is_eligible(row, now_local)
-            if not ok:
-                skipped += 1
-                logging.info(f"Skip cause {causeno or '<none>'}: {reason}")
-                continue
-        else:
-            # In test mode, still bail early if datetime can't be parsed
-            start_dt = combine_date_time_local(row.get(COL_VISITDATE), row.get(COL_VISITTIME), TZ_NAME)
-            if not start_dt:
-                skipped += 1
-                logging.info(f"Skip cause {causeno or '<none>'}: invalid date/time in test row")
-                continue
+    # Check eligibility once per row, up front, so existing events can be fetched in one query
+    if args.mode == "live":
+        checks = [
+            row_is_eligible(appt, cal, start_dt, now_local)
+            for appt, cal, start_dt in zip(frame[COL_APPT_CONFIRMED], frame[COL_CALENDARED], frame[COL_START_DT])
+        ]
+    else:
+        # In test mode, still bail early if datetime can't be parsed
+        checks = [
+            (start_dt is not None, "invalid date/time in test row", start_dt)
+            for start_dt in frame[COL_START_DT]
+        ]
+
+    existing_events = {}
+    if service is not None:
+        existing_events = index_existing_events(service, [s for ok, _, s in checks if ok])
+
+    # Pass 1: build events and locate case files for every eligible row
+    prepared = []  # (causeno, start_dt, event, arp_path, order_path)
+    for row, (ok, reason, start_dt) in zip(rows, checks):
+        causeno, vdate, vtime, waddress, ward_first, ward_last, g1_email, g2_primary, g2_typo, _, _, _ = row
+        causeno = str(causeno or "").strip()
+        ward_first = str(ward_first or "").strip()
+        ward_last = str(ward_last or "").strip()
+
+        if not ok:
+            skipped += 1
+            logging.info(f"Skip cause {causeno or '<none>'}: {reason}")
+            continue
 
         # Attendees
-        g1_email = clean_email(row.get(COL_G1_EMAIL)) if COL_G1_EMAIL in row.index else None
-        g2_email = coalesce_g2_email(row)
+        g1_email = clean_email(g1_email)
+        g2_email = coalesce_g2_email(g2_primary, g2_typo)
         attendees = pick_attendees(g1_email, g2_email)
 
         # Log raw cells to help troubleshoot
-        logging.info(f"Raw cells: visitdate={row.get(COL_VISITDATE)!r}, visittime={row.get(COL_VISITTIME)!r}")
+        logging.info(f"Raw cells: visitdate={vdate!r}, visittime={vtime!r}")
 
         # Build event
         try:
-            event = build_event(row)
+            event = build_event(causeno, ward_first, ward_last, str(waddress or "").strip(), start_dt)
         except Exception as e:
             skipped += 1
             logging.warning(f"Row build failed for cause {causeno}: {e}")
@@ -640,117 +913,86 @@ def main():
         if attendees:
             event["attendees"] = attendees
 
-        # Case folder & docs - upload both ARP and ORDER to Drive and attach to event
+        # Case folder & docs - ARP and ORDER are uploaded to Drive in pass 2
         case_folder = find_case_folder(BASE_GUARDIAN_FOLDER, causeno) if causeno else None
         arp_files, order_files = ([], [])
-        arp_file_id = None
-        order_file_id = None
-        
         if case_folder:
             arp_files, order_files = list_arp_order_files(case_folder)
-            
-            # Upload files to Google Drive if found
-            if arp_files or order_files:
-                if args.dry_run:
-                    # In dry-run mode, just log what would be attached
-                    if arp_files:
-                        logging.info(f"DRY-RUN: Would upload ARP file: {arp_files[0].name}")
-                    if order_files:
-                        logging.info(f"DRY-RUN: Would upload ORDER file: {order_files[0].name}")
-                    logging.info(f"DRY-RUN: Would attach files to calendar event")
-                else:
-                    try:
-                        drive_service = get_drive_service()
-                        folder_id = find_or_create_drive_folder(drive_service, DRIVE_FOLDER_NAME)
-                        if folder_id:
-                            # Upload ARP file if found
-                            if arp_files:
-                                arp_file_id = upload_arp_to_drive(drive_service, arp_files[0], causeno, folder_id)
-                            
-                            # Upload ORDER file if found
-                            if order_files:
-                                order_file_id = upload_order_to_drive(drive_service, order_files[0], causeno, folder_id)
-                            
-                            # Add attachments to event
-                            if arp_file_id or order_file_id:
-                                if 'attachments' not in event:
-                                    event['attachments'] = []
-                                
-                                if arp_file_id:
-                                    event['attachments'].append({
-                                        'fileUrl': f"https://drive.google.com/file/d/{arp_file_id}/view",
-                                        'title': f"{causeno}_ARP.pdf"
-                                    })
-                                
-                                if order_file_id:
-                                    event['attachments'].append({
-                                        'fileUrl': f"https://drive.google.com/file/d/{order_file_id}/view",
-                                        'title': f"{causeno}_ORDER.pdf"
-                                    })
-                    except Exception as e:
-                        logging.warning(f"Failed to upload files to Drive for cause {causeno}: {e}")
+
+        if args.dry_run and (arp_files or order_files):
+            # In dry-run mode, just log what would be attached
+            if arp_files:
+                logging.info(f"DRY-RUN: Would upload ARP file: {arp_files[0].name}")
+            if order_files:
+                logging.info(f"DRY-RUN: Would upload ORDER file: {order_files[0].name}")
+            logging.info(f"DRY-RUN: Would attach files to calendar event")
 
         logging.info(
             f"Prepared event for cause={causeno}, ward={ward_last}, {ward_first}; "
             f"attendees={[a['email'] for a in attendees] if attendees else []}; "
             f"case_folder={case_folder or 'n/a'}; "
-            f"ARP_found={len(arp_files)}; Order_found={len(order_files)}; "
-            f"ARP_attached={'Yes' if arp_file_id else 'No'}; ORDER_attached={'Yes' if order_file_id else 'No'}"
+            f"ARP_found={len(arp_files)}; Order_found={len(order_files)}"
         )
 
         if args.dry_run:
             logging.info("DRY-RUN: Would insert calendar event.")
             continue
 
+        prepared.append((
+            causeno,
+            start_dt,
+            event,
+            arp_files[0] if arp_files else None,
+            order_files[0] if order_files else None,
+        ))
+
+    # Pass 2: upload every ARP/ORDER file to Drive concurrently and attach to its event
+    jobs = [(causeno, arp_path, order_path) for causeno, _, _, arp_path, order_path in prepared]
+    if any(arp_path or order_path for _, arp_path, order_path in jobs):
         try:
-            # Check for existing event and delete if found (rescheduling)
-            start_dt = combine_date_time_local(row.get(COL_VISITDATE), row.get(COL_VISITTIME), TZ_NAME)
-            existing_event_id = find_existing_event(service, causeno, start_dt)
-            if existing_event_id:
-                logging.info(f"Found existing event for cause {causeno}, deleting old event...")
-                delete_existing_event(service, existing_event_id, causeno)
-            
-            # Create new event with attachments support
-            created_event = (
-                service.events()
-                .insert(calendarId=CALENDAR_ID, body=event, sendUpdates="all", supportsAttachments=True)
-                .execute()
-            )
-            created += 1
-            logging.info(f"Created event: {created_event.get('htmlLink')}")
-            
-            # Mark Calendared as "Y" to prevent duplicates
-            try:
-                import openpyxl
-                wb = openpyxl.load_workbook(EXCEL_PATH)
-                ws = wb["Sheet1"]
-                
-                # Find the row with this cause number (causeno is in column 4)
-                for row_idx in range(2, ws.max_row + 1):
-                    if str(ws.cell(row=row_idx, column=4).value).strip() == causeno:
-                        # Find or create Calendared column
-                        cal_col = None
-                        for col_idx in range(1, ws.max_column + 1):
-                            if ws.cell(row=1, column=col_idx).value == "Calendared":
-                                cal_col = col_idx
-                                break
-                        
-                        if cal_col is None:
-                            # Create Calendared column at the end
-                            cal_col = ws.max_column + 1
-                            ws.cell(row=1, column=cal_col, value="Calendared")
-                        
-                        # Mark Calendared as "Y"
-                        ws.cell(row=row_idx, column=cal_col, value="Y")
-                        wb.save(EXCEL_PATH)
-                        logging.info(f"Marked Calendared=Y for cause {causeno}")
-                        break
-            except Exception as excel_error:
-                logging.warning(f"Failed to mark Calendared for cause {causeno}: {excel_error}")
-                
+            # Build Drive service and resolve the folder once per run
+            drive_creds = get_drive_credentials()
+            drive_service = get_drive_service(drive_creds)
+            folder_id = find_or_create_drive_folder(drive_service, DRIVE_FOLDER_NAME)
+            if folder_id:
+                uploaded = upload_case_files(drive_creds, folder_id, jobs)
+                for (causeno, _, event, _, _), (arp_file_id, order_file_id) in zip(prepared, uploaded):
+                    # Add attachments to event
+                    if arp_file_id or order_file_id:
+                        event['attachments'] = []
+
+                        if arp_file_id:
+                            event['attachments'].append({
+                                'fileUrl': f"https://drive.google.com/file/d/{arp_file_id}/view",
+                                'title': f"{causeno}_ARP.pdf"
+                            })
+
+                        if order_file_id:
+                            event['attachments'].append({
+                                'fileUrl': f"https://drive.google.com/file/d/{order_file_id}/view",
+                                'title': f"{causeno}_ORDER.pdf"
+                            })
+                    logging.info(
+                        f"Attachments for cause={causeno}: "
+                        f"ARP_attached={'Yes' if arp_file_id else 'No'}; ORDER_attached={'Yes' if order_file_id else 'No'}"
+                    )
         except Exception as e:
-            skipped += 1
-            logging.exception(f"Failed to create event for cause {causeno}: {e}")
+            logging.warning(f"Failed to upload files to Drive: {e}")
+
+    # Pass 3: delete any existing event for the same cause/day (rescheduling)
+    for causeno, start_dt, _, _, _ in prepared:
+        existing_event_id = existing_events.pop((causeno, start_dt.date()), None)
+        if existing_event_id:
+            logging.info(f"Found existing event for cause {causeno}: {existing_event_id}, deleting old event...")
+            delete_existing_event(service, existing_event_id, causeno)
+
+    # Pass 4: create the new events (with attachments support) in batched requests
+    calendared_causes = insert_events_batched(service, [(causeno, event) for causeno, _, event, _, _ in prepared])
+    created = len(calendared_causes)
+    skipped += len(prepared) - created
+
+    # Mark Calendared as "Y" to prevent duplicates
+    mark_calendared(EXCEL_PATH, calendared_causes)
 
     logging.info(f"Done. Created={created}, Skipped={skipped}")
 
@@ -34,13 +34,16 @@ import datetime as dt
 import json
 import logging
 import os
+import random
 import re
 import sys
+import time
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import pandas as pd
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -99,9 +102,32 @@ COL_VISITTIME = "visittime"
 
 COL_CONTACT_ADDED = "Contact_added"  # created/appended at end if missing
 
+# Text columns stripped once up front (missing columns read as "")
+TEXT_COLUMNS = [
+    COL_CAUSENO, COL_WARDFIRST, COL_WARDLAST, COL_WADDRESS,
+    COL_G1_NAME, COL_G1_EMAIL, COL_G1_PHONE,
+    COL_G2_NAME, COL_G2_PHONE,
+]
+
 # OAuth scope
 SCOPES_PEOPLE = ["https://www.googleapis.com/auth/contacts"]
 
+# Person fields read for dedupe and written on update
+# Contacts we create carry a stable externalId "<causeno>::<guardian label>" (type EXTERNAL_ID_TYPE)
+EXTERNAL_ID_TYPE = "cvr"
+CONTACT_FIELDS = "names,emailAddresses,phoneNumbers,biographies,addresses,memberships,externalIds"
+_NON_DIGIT_RE = re.compile(r"\D")
+
+# People API writes run one at a time (Google asks that mutate requests for the same user be sequential).
+# Updates use execute(num_retries=...) (exponential backoff on 429/5xx); creates go through
+# execute_create, which retries 429 only
+API_RETRIES = 5
+BACKOFF_MAX = 30.0  # seconds
+
+# Time cell parsing: "9", "930", "9:30", "9:30pm", ...
+_TIME_RE = re.compile(r"(\d{1,2})(?::?(\d{2}))?(am|pm)?")
+_NULL_TOKENS = frozenset({"tbd", "na", "n/a", "none", ""})
+
 # =========================
 # Logging
 # =========================
@@ -138,7 +164,7 @@ def find_client_secret_json(creds_dir: str) -> Path:
             continue
     raise FileNotFoundError("No OAuth desktop client JSON found.")
 
-def get_people_service():
+def get_people_credentials():
     token_path = Path(CREDENTIALS_DIR) / "token_people.json"
     creds = None
     if token_path.exists():
@@ -164,7 +190,13 @@ def get_people_service():
 
         open(token_path, "w", encoding="utf-8").write(creds.to_json())
         logging.info(f"Saved People token: {token_path}")
-    return build("people", "v1", credentials=creds, cache_discovery=False)
+    return creds
+
+def get_people_service(creds=None):
+    if creds is None:
+        creds = get_people_credentials()
+    # Bundled (static) discovery doc: no discovery HTTP round-trip
+    return build("people", "v1", credentials=creds, cache_discovery=False, static_discovery=True)
 
 # =========================
 # Excel helpers
@@ -174,25 +206,19 @@ def read_df(path: str) -> pd.DataFrame:
     df.columns = [c.strip() for c in df.columns]
     return df
 
-def ensure_contact_added_column(wb_path: str, header_name: str) -> int:
-    wb = load_workbook(wb_path)
-    ws = wb.active
-    headers = [str(c.value).strip() if c.value is not None else "" for c in ws[1]]
+def excel_row_for_idx(df_index: int) -> int:
+    return df_index + 2  # header row is 1
+
+def ensure_contact_added_column(ws, header_name: str) -> int:
+    """Column index of header_name on an open worksheet; appended to row 1 if missing."""
+    first = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    headers = [str(v).strip() if v is not None else "" for v in first]
     if header_name in headers:
-        col_idx = headers.index(header_name) + 1
-    else:
-        col_idx = len(headers) + 1
-        ws.cell(row=1, column=col_idx, value=header_name)
-    wb.save(wb_path); wb.close()
+        return headers.index(header_name) + 1
+    col_idx = len(headers) + 1
+    ws.cell(row=1, column=col_idx, value=header_name)
     return col_idx
 
-def write_Y_at_row(wb_path: str, col_idx: int, df_index: int):
-    wb = load_workbook(wb_path)
-    ws = wb.active
-    excel_row = df_index + 2  # header row is 1
-    ws.cell(row=excel_row, column=col_idx, value="Y")
-    wb.save(wb_path); wb.close()
-
 # =========================
 # Date/time parsing (aligned with Scripts #1/#2)
 # =========================
@@ -219,9 +245,9 @@ def parse_time_cell(t):
         try: return pd.to_datetime(t, unit="d", origin="1899-12-30").time()
         except Exception: pass
     s = str(t).strip().lower()
-    if not s or s in {"tbd", "na", "n/a", "none"}: return None
+    if s in _NULL_TOKENS: return None
     s = s.replace(" ", "").replace(".", ":")
-    m = re.fullmatch(r"(\d{1,2})(?::?(\d{2}))?(am|pm)?", s)
+    m = _TIME_RE.fullmatch(s)
     if m:
         hh = int(m.group(1)); mm = int(m.group(2) or 0); ampm = m.group(3)
         if ampm == "pm" and hh < 12: hh += 12
@@ -245,17 +271,44 @@ def format_visit_dt(start_dt: dt.datetime | None) -> tuple[str, str]:
 # =========================
 # Cleaners (fix "nan", "none", blanks) + label passthrough
 # =========================
+# Something@something with no spaces: rejects a stray "@" or "name@" in the email cells
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+")
+
+_BLANK_TOKENS = frozenset({"", "none", "n/a", "na", "null", "nil", "nan"})
+
 def _is_blank(v):
-    if v is None:
-        return True
-    s = str(v).strip().lower()
-    return s in {"", "none", "n/a", "na", "null", "nil", "nan"}
+    return v is None or str(v).strip().lower() in _BLANK_TOKENS
+
+# Column-wise equivalents of clean_phone / clean_email (same blank rules)
+def _nonblank_series(s: pd.Series) -> pd.Series:
+    x = s.astype("string").str.strip().str.lower()
+    return (x.notna() & ~x.isin(_BLANK_TOKENS)).fillna(False).astype(bool)
+
+def _email_mask(s: pd.Series) -> pd.Series:
+    return _nonblank_series(s) & s.astype(str).str.contains(_EMAIL_RE, na=False)
+
+def stripped_text_frame(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """str(...).strip() for whole columns at once; NaN/missing -> ""."""
+    text = df.reindex(columns=columns).astype("string").fillna("")
+    return text.apply(lambda s: s.str.strip()).astype(object)
+
+def has_any_contact_mask(df: pd.DataFrame) -> pd.Series:
+    """True where the row has at least one usable guardian email/phone."""
+    blank = pd.Series(False, index=df.index)
+    def col(name): return df[name] if name in df.columns else None
+    def email(name): c = col(name); return blank if c is None else _email_mask(c)
+    def phone(name): c = col(name); return blank if c is None else _nonblank_series(c)
+    return (
+        email(COL_G1_EMAIL) | phone(COL_G1_PHONE)
+        | email(COL_G2_EMAIL_PRIMARY) | email(COL_G2_EMAIL_TYPO)
+        | phone(COL_G2_PHONE)
+    )
 
 def clean_email(v):
     if _is_blank(v):
         return None
     s = str(v).strip()
-    return s if "@" in s else None
+    return s if _EMAIL_RE.search(s) else None
 
 def clean_phone(v):
     if _is_blank(v):
@@ -268,50 +321,39 @@ def exact_label(v):
         return ""
     return str(v).strip()
 
-def coalesce_g2_email(row: pd.Series) -> str | None:
-    primary = clean_email(row.get(COL_G2_EMAIL_PRIMARY))
-    if primary:
-        return primary
-    typo = clean_email(row.get(COL_G2_EMAIL_TYPO))
-    return typo
+def coalesce_g2_email(primary, typo) -> str | None:
+    return clean_email(primary) or clean_email(typo)
 
 # Try to pull guardian-specific addresses from a variety of likely column names
-def get_guardian_address(row: pd.Series, which: int) -> str | None:
-    # Common variants; add more if your sheet uses a different header
-    if which == 1:
-        candidates = ["gaddress", "g1address", "guardian1_address", "guardian1address", "guardianaddress", "gaddress1"]
-    else:
-        candidates = ["g2address", "guardian2_address", "guardian2address", "gaddress2"]
-    for col in candidates:
-        if col in row.index:
-            addr = str(row.get(col) or "").strip()
-            if not _is_blank(addr):
-                return addr
+# Common variants; add more if your sheet uses a different header
+G1_ADDRESS_CANDIDATES = ("gaddress", "g1address", "guardian1_address", "guardian1address", "guardianaddress", "gaddress1")
+G2_ADDRESS_CANDIDATES = ("g2address", "guardian2_address", "guardian2address", "gaddress2")
+
+def resolve_address_columns(columns, candidates) -> tuple:
+    """Candidate address headers present in this sheet (resolved once, in priority order)."""
+    present = set(columns)
+    return tuple(c for c in candidates if c in present)
+
+def get_guardian_address(values) -> str | None:
+    """First non-blank value from the resolved address columns (in priority order)."""
+    for v in values:
+        addr = str(v or "").strip()
+        if not _is_blank(addr):
+            return addr
     return None
 
 # =========================
 # People API helpers
 # =========================
-def build_display_and_note(guardian_label, ward_first, ward_last, causeno, start_dt, ward_address):
-    """Display uses guardian cell EXACTLY as typed; Notes hold details."""
-    glabel = (guardian_label or "").strip()
-    ward_first = (ward_first or "").strip()
-    ward_last = (ward_last or "").strip()
-    cause = (causeno or "").strip()
-
+def build_display_and_note(glabel, ward_first, ward_last, cause, date_str, time_str, ward_address):
+    """Display uses guardian cell EXACTLY as typed; Notes hold details. Inputs are pre-stripped."""
     display = f"{glabel or 'Guardian'} for {ward_first} {ward_last}"
-
-    date_str, time_str = format_visit_dt(start_dt)
-    note_lines = [
+    note = "\n".join(filter(None, [
         f"Guardian for {ward_first} {ward_last}",
         f"Cause: {cause}",
-    ]
-    if date_str and time_str:
-        note_lines.append(f"Visit: {date_str} at {time_str} ({TZ_NAME})")
-    if ward_address:
-        note_lines.append(f"Ward address: {ward_address}")
-    note = "\n".join(note_lines)
-
+        f"Visit: {date_str} at {time_str} ({TZ_NAME})" if date_str and time_str else "",
+        f"Ward address: {ward_address}" if ward_address else "",
+    ]))
     return display, note
 
 def get_or_create_group(service, label: str) -> str | None:
@@ -328,28 +370,85 @@ def get_or_create_group(service, label: str) -> str | None:
         logging.warning(f"Could not get/create contact group '{label}': {e}")
         return None
 
-def search_existing(service, query: str):
+def _norm_email(v) -> str:
+    return (v or "").strip().lower()
+
+def _norm_phone(v) -> str:
+    return _NON_DIGIT_RE.sub("", v or "")
+
+def _norm_name(v) -> str:
+    return (v or "").strip().lower()
+
+def contact_external_id(causeno, guardian_label) -> str:
+    cause = (causeno or "").strip()
+    return f"{cause}::{(guardian_label or '').strip()}" if cause else ""
+
+def new_contact_index() -> dict:
+    return {"by_external_id": {}, "by_email": {}, "by_phone": {}, "by_name": {}}
+
+def index_person(index: dict, person: dict):
+    """Add/refresh one person in the lookup index (latest etag wins)."""
+    for x in person.get("externalIds", []):
+        if x.get("type") == EXTERNAL_ID_TYPE and x.get("value"):
+            index["by_external_id"][x["value"]] = person
+    for e in person.get("emailAddresses", []):
+        key = _norm_email(e.get("value"))
+        if key: index["by_email"][key] = person
+    for p in person.get("phoneNumbers", []):
+        key = _norm_phone(p.get("value"))
+        if key: index["by_phone"][key] = person
+    for n in person.get("names", []):
+        for field in ("displayName", "givenName"):
+            key = _norm_name(n.get(field))
+            if key: index["by_name"][key] = person
+
+def load_contact_index(service) -> dict:
+    """Fetch all contacts once (paged) so dedupe lookups are local dict hits."""
+    index = new_contact_index()
+    if service is None:
+        return index
+    token = None
+    total = 0
     try:
-        resp = service.people().searchContacts(
-            query=query,
-            pageSize=5,
-            readMask="names,emailAddresses,phoneNumbers,biographies,addresses,memberships"
-        ).execute()
-        people = resp.get("results", [])
-        if not people:
-            return None
-        return people[0].get("person")
-    except Exception:
-        return None
+        while True:
+            resp = service.people().connections().list(
+                resourceName="people/me",
+                pageSize=1000,
+                personFields=CONTACT_FIELDS,
+                pageToken=token,
+            ).execute()
+            for person in resp.get("connections", []):
+                index_person(index, person)
+                total += 1
+            token = resp.get("nextPageToken")
+            if not token:
+                break
+    except Exception as e:
+        logging.warning(f"Could not load existing contacts (dedupe disabled for missing pages): {e}")
+    logging.info(f"Loaded {total} existing contacts for dedupe")
+    return index
+
+def lookup_existing(index: dict, external_id, email, phone, display):
+    """Dedupe lookup: our externalId > email > phone > display label."""
+    existing = index["by_external_id"].get(external_id) if external_id else None
+    if (existing is None) and email:
+        existing = index["by_email"].get(_norm_email(email))
+    if (existing is None) and phone:
+        key = _norm_phone(phone)
+        existing = index["by_phone"].get(key) if key else None
+    if (existing is None) and display:
+        existing = index["by_name"].get(_norm_name(display))
+    return existing
 
 def person_patch_for_update(existing, add_body, group_resource):
     """
     Build a patch that actually updates fields:
     - Always update names (so display changes take effect).
-    - Append new emails/phones (dedup by value).
+    - Append new emails/phones (dedup by lower-cased email / digits-only phone).
     - Merge Notes (biographies).
     - Preserve existing addresses unless we're adding a new one.
     - Ensure membership in the contact group.
+    - Keep existing externalIds and add ours.
     """
     person = {"resourceName": existing.get("resourceName"), "etag": existing.get("etag")}
 
@@ -359,14 +458,14 @@ def person_patch_for_update(existing, add_body, group_resource):
     elif existing.get("names"):
         person["names"] = existing["names"]
 
-    # 2) Emails — add missing
-    existing_emails = {e.get("value") for e in existing.get("emailAddresses", [])}
-    new_emails = [e for e in add_body.get("emailAddresses", []) if e.get("value") not in existing_emails]
+    # 2) Emails — add missing (case-insensitive)
+    existing_emails = {_norm_email(e.get("value")) for e in existing.get("emailAddresses", [])}
+    new_emails = [e for e in add_body.get("emailAddresses", []) if _norm_email(e.get("value")) not in existing_emails]
     person["emailAddresses"] = existing.get("emailAddresses", []) + new_emails
 
-    # 3) Phones — add missing
-    existing_phones = {p.get("value") for p in existing.get("phoneNumbers", [])}
-    new_phones = [p for p in add_body.get("phoneNumbers", []) if p.get("value") not in existing_phones]
+    # 3) Phones — add missing (digits only, so formatting differences don't duplicate)
+    existing_phones = {_norm_phone(p.get("value")) for p in existing.get("phoneNumbers", [])}
+    new_phones = [p for p in add_body.get("phoneNumbers", []) if _norm_phone(p.get("value")) not in existing_phones]
     person["phoneNumbers"] = existing.get("phoneNumbers", []) + new_phones
 
     # 4) Notes — merge ours in if not already present
@@ -399,11 +498,32 @@ def person_patch_for_update(existing, add_body, group_resource):
     if memberships:
         person["memberships"] = memberships
 
+    # 7) External IDs — keep existing, add ours (externalIds is in updatePersonFields)
+    existing_ids = existing.get("externalIds", [])
+    have_ids = {(x.get("type"), x.get("value")) for x in existing_ids}
+    new_ids = [x for x in add_body.get("externalIds", []) if (x.get("type"), x.get("value")) not in have_ids]
+    if existing_ids or new_ids:
+        person["externalIds"] = existing_ids + new_ids
+
     return person
 
 
-def create_or_update_contact(service, guardian_label, email, phone, ward_first, ward_last, causeno, ward_address, contact_address, start_dt, group_resource, dry_run=False):
-    display, note = build_display_and_note(guardian_label, ward_first, ward_last, causeno, start_dt, ward_address)
+def execute_create(request):
+    """Run a createContact request, retrying only 429. Create is not idempotent: a 5xx may
+    still have created the contact, so num_retries (which retries 5xx) would risk duplicates."""
+    for attempt in range(API_RETRIES + 1):
+        try:
+            return request.execute()
+        except HttpError as he:
+            if getattr(he, "resp", None) is None or he.resp.status != 429 or attempt == API_RETRIES:
+                raise
+            delay = min(BACKOFF_MAX, 2 ** attempt + random.uniform(0, 1))
+            logging.info(f"People API rate-limited on create; retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+def create_or_update_contact(service, index, guardian_label, email, phone, ward_first, ward_last, causeno, ward_address, contact_address, visit, group_resource, dry_run=False):
+    date_str, time_str = visit
+    display, note = build_display_and_note(guardian_label, ward_first, ward_last, causeno, date_str, time_str, ward_address)
 
     # Build add_body (contact fields) — NO splitting; show display string as visible name
     names = [{"givenName": display}]
@@ -413,6 +533,8 @@ def create_or_update_contact(service, guardian_label, email, phone, ward_first,
     bios = [{"value": note}] if note else []
     memberships = [{"contactGroupMembership": {"contactGroupResourceName": group_resource}}] if group_resource else []
 
+    external_id = contact_external_id(causeno, guardian_label)
+
     add_body = {
         "names": names,
         "emailAddresses": email_addrs,
@@ -420,17 +542,13 @@ def create_or_update_contact(service, guardian_label, email, phone, ward_first,
         "addresses": addresses,
         "biographies": bios,
     }
+    if external_id:
+        add_body["externalIds"] = [{"value": external_id, "type": EXTERNAL_ID_TYPE}]
     if memberships:
         add_body["memberships"] = memberships
 
-    # Dedupe search: email > phone > display label
-    existing = None
-    if email:
-        existing = search_existing(service, email)
-    if (existing is None) and phone:
-        existing = search_existing(service, phone)
-    if (existing is None) and display:
-        existing = search_existing(service, display)
+    # Dedupe against the prefetched contact index: externalId > email > phone > display label
+    existing = lookup_existing(index, external_id, email, phone, display)
 
     if dry_run:
         action = "Would UPDATE" if existing else "Would CREATE"
@@ -440,11 +558,13 @@ def create_or_update_contact(service, guardian_label, email, phone, ward_first,
     if existing:
         try:
             patch = person_patch_for_update(existing, add_body, group_resource)
-            service.people().updateContact(
+            updated = service.people().updateContact(
                 resourceName=patch["resourceName"],
-                updatePersonFields="names,emailAddresses,phoneNumbers,biographies,addresses,memberships",
+                updatePersonFields=CONTACT_FIELDS,
+                personFields=CONTACT_FIELDS,
                 body=patch,
-            ).execute()
+            ).execute(num_retries=API_RETRIES)
+            index_person(index, updated)  # fresh etag for any later update this run
             logging.info(f"Updated contact: '{display}'")
             return True
         except Exception as e:
@@ -452,7 +572,10 @@ def create_or_update_contact(service, guardian_label, email, phone, ward_first,
             return False
     else:
         try:
-            service.people().createContact(body=add_body).execute()
+            created = execute_create(service.people().createContact(
+                body=add_body, personFields=CONTACT_FIELDS
+            ))
+            index_person(index, created)
             logging.info(f"Created contact: '{display}'")
             return True
         except Exception as e:
@@ -483,31 +606,26 @@ def main():
     if missing:
         logging.error(f"Missing expected columns: {missing}"); sys.exit(3)
 
-    # Helper: has any guardian contact method (using cleaners)
-    def row_has_any_contact(r):
-        g1_email = clean_email(r.get(COL_G1_EMAIL))
-        g1_phone = clean_phone(r.get(COL_G1_PHONE))
-        g2_email = coalesce_g2_email(r)
-        g2_phone = clean_phone(r.get(COL_G2_PHONE))
-        return any([g1_email, g1_phone, g2_email, g2_phone])
+    # Has any guardian contact method (vectorized; same rules as the cleaners)
+    has_contact = has_any_contact_mask(df)
 
     # Pick rows
     if args.mode == "test_last_row":
-        candidates = df[df.apply(row_has_any_contact, axis=1)]
+        candidates = df[has_contact]
         if candidates.empty:
             logging.info("No rows with guardian email/phone found. Nothing to test.")
             return
         idx = candidates.index[-1]
-        rows = [(idx, df.loc[idx])]
+        row_index = [idx]
         logging.info(f"Test mode: using last row with any guardian email/phone index={idx}")
     else:
         if COL_CONTACT_ADDED in df.columns:
-            eligible = df[(df[COL_CONTACT_ADDED].isna()) | (df[COL_CONTACT_ADDED].astype(str).str.strip() == "")]
+            added = df[COL_CONTACT_ADDED]
+            eligible = df[has_contact & (added.isna() | added.astype(str).str.strip().eq(""))]
         else:
-            eligible = df
-        eligible = eligible[eligible.apply(row_has_any_contact, axis=1)]
-        rows = list(eligible.iterrows())
-        if not rows:
+            eligible = df[has_contact]
+        row_index = list(eligible.index)
+        if not row_index:
             logging.info("No eligible rows to process (Contact_added not blank or no guardian contact info).")
             return
 
@@ -520,61 +638,93 @@ def main():
             group_resource = get_or_create_group(people, CONTACT_GROUP_LABEL)
             if group_resource:
                 logging.info(f"Using contact group: {CONTACT_GROUP_LABEL} ({group_resource})")
-
-    # Prepare Excel writing
+    contact_index = load_contact_index(people)
+
+    # Guardian address columns: resolve once, not per row
+    g1_addr_cols = resolve_address_columns(df.columns, G1_ADDRESS_CANDIDATES)
+    g2_addr_cols = resolve_address_columns(df.columns, G2_ADDRESS_CANDIDATES)
+    has_visit = COL_VISITDATE in df.columns and COL_VISITTIME in df.columns
+
+    # Selected rows as plain tuples: stripped text columns (once, column-wise) + raw cells
+    selected = df.loc[row_index]
+    raw_columns = [COL_VISITDATE, COL_VISITTIME, COL_G2_EMAIL_PRIMARY, COL_G2_EMAIL_TYPO, *g1_addr_cols, *g2_addr_cols]
+    work = pd.concat([stripped_text_frame(selected, TEXT_COLUMNS), selected.reindex(columns=raw_columns)], axis=1)
+    pos = {c: i + 1 for i, c in enumerate(work.columns)}  # +1: itertuples puts the index first
+    g1_addr_pos = [pos[c] for c in g1_addr_cols]
+    g2_addr_pos = [pos[c] for c in g2_addr_cols]
+    rows = list(work.itertuples(index=True, name=None))
+
+    # Prepare Excel writing: one workbook load (on first success) and one save at the end
+    wb = ws = None
     contact_added_col_idx = None
     processed_rows = 0
 
-    for idx, row in rows:
-        causeno    = str(row.get(COL_CAUSENO, "") or "").strip()
-        ward_first = str(row.get(COL_WARDFIRST, "") or "").strip()
-        ward_last  = str(row.get(COL_WARDLAST, "") or "").strip()
-        ward_addr  = str(row.get(COL_WADDRESS, "") or "").strip()
-
-        # Visit datetime (optional, for Notes)
-        start_dt = None
-        if COL_VISITDATE in df.columns and COL_VISITTIME in df.columns:
-            start_dt = combine_date_time_local(row.get(COL_VISITDATE), row.get(COL_VISITTIME), TZ_NAME)
-
-        # Guardian 1 (label + own address)
-        g1_label  = exact_label(row.get(COL_G1_NAME))
-        g1_email  = clean_email(row.get(COL_G1_EMAIL))
-        g1_phone  = clean_phone(row.get(COL_G1_PHONE))
-        g1_addr   = get_guardian_address(row, which=1)
-
-        # Guardian 2 (label + own address)
-        g2_label  = exact_label(row.get(COL_G2_NAME))
-        g2_email  = coalesce_g2_email(row)
-        g2_phone  = clean_phone(row.get(COL_G2_PHONE))
-        g2_addr   = get_guardian_address(row, which=2)
-
-        any_success = False
-        if g1_email or g1_phone:
-            ok = create_or_update_contact(
-                people, g1_label, g1_email, g1_phone,
-                ward_first, ward_last, causeno,
-                ward_addr, g1_addr, start_dt, group_resource,
-                dry_run=args.dry_run
-            )
-            any_success = any_success or ok
-        if g2_email or g2_phone:
-            ok = create_or_update_contact(
-                people, g2_label, g2_email, g2_phone,
-                ward_first, ward_last, causeno,
-                ward_addr, g2_addr, start_dt, group_resource,
-                dry_run=args.dry_run
-            )
-            any_success = any_success or ok
-
-        if any_success and (not args.dry_run):
-            if contact_added_col_idx is None:
-                contact_added_col_idx = ensure_contact_added_column(EXCEL_PATH, COL_CONTACT_ADDED)
+    # One row = up to two contacts, one row at a time
+    try:
+        for row in rows:
+            idx = row[0]
+            causeno    = row[pos[COL_CAUSENO]]
+            ward_first = row[pos[COL_WARDFIRST]]
+            ward_last  = row[pos[COL_WARDLAST]]
+            ward_addr  = row[pos[COL_WADDRESS]]
+
+            # Visit datetime (optional, for Notes)
+            start_dt = None
+            if has_visit:
+                start_dt = combine_date_time_local(row[pos[COL_VISITDATE]], row[pos[COL_VISITTIME]], TZ_NAME)
+            visit = format_visit_dt(start_dt)  # once per row, shared by both guardians
+
+            # Guardian 1 (label + own address)
+            g1_label  = exact_label(row[pos[COL_G1_NAME]])
+            g1_email  = clean_email(row[pos[COL_G1_EMAIL]])
+            g1_phone  = clean_phone(row[pos[COL_G1_PHONE]])
+            g1_addr   = get_guardian_address(row[i] for i in g1_addr_pos)
+
+            # Guardian 2 (label + own address)
+            g2_label  = exact_label(row[pos[COL_G2_NAME]])
+            g2_email  = coalesce_g2_email(row[pos[COL_G2_EMAIL_PRIMARY]], row[pos[COL_G2_EMAIL_TYPO]])
+            g2_phone  = clean_phone(row[pos[COL_G2_PHONE]])
+            g2_addr   = get_guardian_address(row[i] for i in g2_addr_pos)
+
+            any_success = False
+            if g1_email or g1_phone:
+                ok = create_or_update_contact(
+                    people, contact_index, g1_label, g1_email, g1_phone,
+                    ward_first, ward_last, causeno,
+                    ward_addr, g1_addr, visit, group_resource,
+                    dry_run=args.dry_run
+                )
+                any_success = any_success or ok
+            if g2_email or g2_phone:
+                ok = create_or_update_contact(
+                    people, contact_index, g2_label, g2_email, g2_phone,
+                    ward_first, ward_last, causeno,
+                    ward_addr, g2_addr, visit, group_resource,
+                    dry_run=args.dry_run
+                )
+                any_success = any_success or ok
+
+            if any_success and (not args.dry_run):
+                try:
+                    if ws is None:
+                        wb = load_workbook(EXCEL_PATH)
+                        ws = wb.active
+                        contact_added_col_idx = ensure_contact_added_column(ws, COL_CONTACT_ADDED)
+                    ws.cell(row=excel_row_for_idx(idx), column=contact_added_col_idx, value="Y")
+                    processed_rows += 1
+                    logging.info(f"Marked {COL_CONTACT_ADDED}='Y' at row index {idx}")
+                except Exception as e:
+                    logging.warning(f"Failed to write 'Y' for row index {idx}: {e}")
+    finally:
+        # Save once (also on Ctrl+C / errors) so completed rows are not re-processed next run
+        if wb is not None:
             try:
-                write_Y_at_row(EXCEL_PATH, contact_added_col_idx, idx)
-                processed_rows += 1
-                logging.info(f"Marked {COL_CONTACT_ADDED}='Y' at row index {idx}")
+                wb.save(EXCEL_PATH)
+                logging.info(f"Saved {COL_CONTACT_ADDED} marks to workbook")
             except Exception as e:
-                logging.warning(f"Failed to write 'Y' for row index {idx}: {e}")
+                logging.warning(f"Failed to save workbook (marks for {processed_rows} rows lost): {e}")
+            finally:
+                wb.close()
 
     logging.info(f"Done. Rows marked Y={processed_rows}")
 
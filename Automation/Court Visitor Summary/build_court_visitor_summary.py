@@ -8,19 +8,19 @@ Excel opened read-only; optional --print and --open
 """
 from __future__ import annotations
 import argparse, os, re, sys
+from functools import lru_cache
 from datetime import datetime, date
 from dateutil import parser as dtparse
-from typing import List, Dict
+from typing import Any, List, Dict
 from pathlib import Path
-import pandas as pd
 
 # -------- deps --------
 try:
     from docx import Document
     from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from docx.shared import Inches, Pt
-    from docx.oxml.ns import qn
-    from docx.oxml import OxmlElement
+    from docx.shared import Emu, Inches, Pt
+    from docx.oxml.ns import qn, nsdecls
+    from docx.oxml import parse_xml
 except ModuleNotFoundError:
     print("ERROR: Missing dependency 'python-docx'. Install it with:\n  py -3 -m pip install python-docx")
     sys.exit(1)
@@ -62,8 +62,10 @@ SUBHEAD_FONT_SIZE_PT = 11
 MARGIN_IN = 0.4            # small margins
 NOTES_ROWS = 26
 
+_WS_RE = re.compile(r"\s+")
+
 def _clean(s: str) -> str:
-    return re.sub(r"\s+", " ", s or "").strip()
+    return _WS_RE.sub(" ", s or "").strip()
 
 # Covers your sample headers & common typos
 COLUMN_ALIASES = {
@@ -96,35 +98,62 @@ COLUMN_ALIASES = {
 
 # -------- helpers --------
 
-def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    colmap: Dict[str, str] = {}
-    lowered = {str(c).lower().strip(): c for c in df.columns}
-    for canon, variants in COLUMN_ALIASES.items():
-        for v in variants:
-            key = v.lower()
-            if key in lowered:
-                colmap[lowered[key]] = canon
-                break
-    return df.rename(columns=colmap)
-
-def coalesce(row: pd.Series, keys: List[str], default: str = "") -> str:
-    for k in keys:
-        if k in row and pd.notna(row[k]) and str(row[k]).strip():
-            return _clean(str(row[k]))
-    return default
-
+# variant (lowered) -> (canonical name, priority); earlier variants win, as listed above
+_VARIANT_TO_CANON: Dict[str, tuple] = {}
+for _canon, _variants in COLUMN_ALIASES.items():
+    for _rank, _v in enumerate(_variants):
+        _VARIANT_TO_CANON.setdefault(_v.lower(), (_canon, _rank))
+
+def normalize_columns(headers: List[str]) -> List[str]:
+    best: Dict[str, tuple] = {}  # canon -> (rank, header position)
+    for i, c in enumerate(headers):
+        hit = _VARIANT_TO_CANON.get(str(c).lower().strip())
+        if hit is None:
+            continue
+        canon, rank = hit
+        if canon not in best or rank <= best[canon][0]:
+            best[canon] = (rank, i)
+    renamed = list(headers)
+    for canon, (_, i) in best.items():
+        renamed[i] = canon
+    return renamed
+
+def clean_cell(v):
+    """Load-time cell cleanup: date/datetime kept as-is, everything else whitespace-collapsed text."""
+    if v is None:
+        return ""
+    if isinstance(v, (datetime, date)):
+        return v
+    return _clean(str(v))
+
+def coalesce(row: Dict[str, Any], keys: List[str], default: str = "") -> str:
+    # Rows are pre-cleaned by load_sheet_rows, so non-empty means usable
+    v = next((row[k] for k in keys if row.get(k)), None)
+    if v is None:
+        return default
+    return v if isinstance(v, str) else _clean(str(v))
+
+# dateutil parsing is slow and rows repeat dates; values must be hashable
+# (str from coalesce, or the raw cell: datetime/date)
+@lru_cache(maxsize=4096)
 def parse_date(val) -> str:
-    if val is None or (isinstance(val, str) and not val.strip()):
+    if val is None:
+        return ""
+    if isinstance(val, (datetime, date)):  # datetime is a date subclass; no reparse needed
+        return val.strftime("%m/%d/%Y")
+    s = str(val)
+    if not s.strip():
         return ""
     try:
-        if isinstance(val, (pd.Timestamp, datetime, date)):
-            dt = pd.to_datetime(val)
-        else:
-            dt = dtparse.parse(str(val), dayfirst=False, fuzzy=True)
-        return dt.strftime("%m/%d/%Y")
+        return dtparse.parse(s, dayfirst=False, fuzzy=True).strftime("%m/%d/%Y")
     except Exception:
-        return str(val)
+        return s
 
+def date_cell(row: Dict[str, Any], key: str):
+    """Raw date/datetime cell as-is (parse_date formats it directly); otherwise cleaned text."""
+    return row.get(key) or ""
+
+@lru_cache(maxsize=4096)
 def age_from_dob(dob: str) -> str:
     if not dob:
         return ""
@@ -158,22 +187,25 @@ def _write_cell_lines(cell, lines: list[tuple[str, bool]]):
         p = cell.add_paragraph(text)
         _set_para_font(p, FONT_SIZE_PT, bold, align=None)
 
-def cell_bottom_border(cell):
-    tcPr = cell._tc.get_or_add_tcPr()
-    tcBorders = tcPr.find(qn('w:tcBorders'))
-    if tcBorders is None:
-        tcBorders = OxmlElement('w:tcBorders')
-        tcPr.append(tcBorders)
-    bottom = OxmlElement('w:bottom')
-    bottom.set(qn('w:val'), 'single')
-    bottom.set(qn('w:sz'), '8')
-    bottom.set(qn('w:space'), '0')
-    bottom.set(qn('w:color'), 'auto')
-    tcBorders.append(bottom)
+# Ruled notes table, built as XML once: NOTES_ROWS single-cell rows with a bottom border
+# and a 10pt non-breaking space (same markup as add_table + a tcBorders bottom per cell)
+_NOTES_ROW_XML = (
+    '<w:tr><w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/>'
+    '<w:tcBorders><w:bottom w:val="single" w:sz="8" w:space="0" w:color="auto"/></w:tcBorders></w:tcPr>'
+    f'<w:p><w:r><w:rPr><w:rFonts w:ascii="{FONT_NAME}" w:hAnsi="{FONT_NAME}" w:eastAsia="{FONT_NAME}"/>'
+    '<w:b w:val="0"/><w:sz w:val="20"/></w:rPr><w:t xml:space="preserve">\u00A0</w:t></w:r></w:p></w:tc></w:tr>'
+)
+NOTES_TABLE_XML = (
+    f'<w:tbl {nsdecls("w")}><w:tblPr><w:tblW w:type="auto" w:w="0"/>'
+    '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+    '</w:tblPr><w:tblGrid><w:gridCol w:w="{width}"/></w:tblGrid>'
+    + _NOTES_ROW_XML * NOTES_ROWS
+    + '</w:tbl>'
+)
 
 # -------- document build --------
 
-def build_doc(row: pd.Series, out_dir: str) -> str:
+def build_doc(row: Dict[str, Any], out_dir: str) -> str:
     doc = Document()
 
     # Margins
@@ -185,27 +217,27 @@ def build_doc(row: pd.Series, out_dir: str) -> str:
 
     # Values
     caseno = coalesce(row, ["caseno"]) or "Unknown"
-    visit_date = parse_date(coalesce(row, ["visitdate"]))
+    visit_date = parse_date(date_cell(row, "visitdate"))
     visit_time = coalesce(row, ["visittime"]).strip()
 
     wardfirst = coalesce(row, ["wardfirst"]) or ""
     wardlast = coalesce(row, ["wardlast"]) or ""
     wname = _clean(f"{wardfirst} {wardlast}")
-    wdob = parse_date(coalesce(row, ["wdob"]))
+    wdob = parse_date(date_cell(row, "wdob"))
     wage = age_from_dob(wdob)
     wtele = coalesce(row, ["wtele"]) or ""
     waddr = coalesce(row, ["waddress"]) or ""
     liveswith = coalesce(row, ["liveswith"]) or ""
 
     g1 = coalesce(row, ["guardian1"]) or ""
-    gdob = parse_date(coalesce(row, ["gdob"]))
+    gdob = parse_date(date_cell(row, "gdob"))
     gtele = coalesce(row, ["gtele"]) or ""
     gemail = coalesce(row, ["gemail"]) or ""
     grel = coalesce(row, ["Relationship"]) or ""
     gaddr = coalesce(row, ["gaddress"]) or ""
 
     g2 = coalesce(row, ["Guardian2"]) or ""
-    g2dob = parse_date(coalesce(row, ["g2dob"]))
+    g2dob = parse_date(date_cell(row, "g2dob"))
     g2tele = coalesce(row, ["g2tele"]) or ""
     g2email = coalesce(row, ["g2eamil"]) or ""
     g2rel = coalesce(row, ["g2Relationship"]) or ""
@@ -265,16 +297,9 @@ def build_doc(row: pd.Series, out_dir: str) -> str:
     nh = doc.add_paragraph("NOTES")
     _set_para_font(nh, FONT_SIZE_PT, bold=True, align=None)
 
-    # Full-width ruled lines
-    notes_table = doc.add_table(rows=NOTES_ROWS, cols=1)
-    notes_table.allow_autofit = False
+    # Full-width ruled lines (one XML parse instead of a per-row python-docx loop)
     avail = section.page_width - section.left_margin - section.right_margin
-    notes_table.columns[0].width = avail
-    for r in notes_table.rows:
-        cell = r.cells[0]
-        cell.text = "\u00A0"
-        _set_para_font(cell.paragraphs[0], size_pt=10, bold=False, align=None)
-        cell_bottom_border(cell)
+    doc.element.body._insert_tbl(parse_xml(NOTES_TABLE_XML.replace("{width}", str(Emu(avail).twips))))
 
     # Save
     os.makedirs(out_dir, exist_ok=True)
@@ -286,25 +311,34 @@ def build_doc(row: pd.Series, out_dir: str) -> str:
 
 # -------- IO & CLI --------
 
-def load_sheet_to_df(path: str, sheet: str | None) -> pd.DataFrame:
+# Headers the form can use (any alias), compared lower/stripped like normalize_columns
+WANTED_HEADERS = frozenset(v.lower().strip() for variants in COLUMN_ALIASES.values() for v in variants)
+
+def load_sheet_rows(path: str, sheet: str | None) -> List[Dict[str, Any]]:
+    """Rows as {normalized header: clean_cell(value)}, only for columns the form uses; blank rows skipped."""
     wb = load_workbook(path, read_only=True, data_only=True)
     try:
         ws = wb[sheet] if sheet else wb.active
-        rows = ws.values
-        headers = next(rows)
-        headers = [str(h).strip() if h is not None else "" for h in headers]
-        df = pd.DataFrame(list(rows), columns=headers)
-        return df
+        rows = ws.iter_rows(values_only=True)
+        headers = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        names = normalize_columns(headers)
+        keep = [(i, names[i]) for i, h in enumerate(headers) if h.lower() in WANTED_HEADERS]
+        out = []
+        for values in rows:
+            rec = {name: clean_cell(values[i]) if i < len(values) else "" for i, name in keep}
+            if any(rec.values()):
+                out.append(rec)
+        return out
     finally:
         wb.close()
 
-def pick_rows_gui(df: pd.DataFrame, last_n: int = 15) -> pd.DataFrame:
+def pick_rows_gui(rows: List[Dict[str, Any]], last_n: int = 15) -> List[Dict[str, Any]]:
     import tkinter as tk
     # Use sheet order: last N physical rows, so newest entries always appear
-    df2 = df.tail(last_n).copy()
+    tail = rows[-last_n:] if last_n else rows
 
     labels = []
-    for _, r in df2.iterrows():
+    for r in tail:
         labels.append(f"{r.get('caseno','')} — {r.get('wardlast','')}, {r.get('wardfirst','')} — {parse_date(r.get('visitdate',''))} {coalesce(r, ['visittime'])}")
 
     root = tk.Tk()
@@ -325,21 +359,29 @@ def pick_rows_gui(df: pd.DataFrame, last_n: int = 15) -> pd.DataFrame:
 
     root.mainloop()
 
-    if not selected:
-        return df2.iloc[0:0]
-    return df2.iloc[selected]
+    return [tail[i] for i in selected]
 
-def try_print_via_word(path: str) -> bool:
+def open_word():
+    """One hidden Word instance for the whole print run (COM start-up costs ~1-2s)."""
     if win32com is None:
         print("Printing requires pywin32. Install with:\n  py -3 -m pip install pywin32")
-        return False
+        return None
     try:
-        word = win32com.client.Dispatch("Word.Application")
+        word = win32com.client.DispatchEx("Word.Application")
         word.Visible = False
+        return word
+    except Exception as e:
+        print(f"Could not start Word for printing: {e}")
+        return None
+
+def try_print_via_word(path: str, word) -> bool:
+    if word is None:
+        return False
+    try:
         doc = word.Documents.Open(path)
-        doc.PrintOut()
+        # Foreground print: the job is spooled before the doc is closed / Word quits
+        doc.PrintOut(Background=False)
         doc.Close(False)
-        word.Quit()
         return True
     except Exception as e:
         print(f"Could not print {path}: {e}")
@@ -360,27 +402,34 @@ def main():
         print(f"ERROR: Workbook not found: {args.workbook}")
         sys.exit(1)
 
-    df = load_sheet_to_df(args.workbook, args.sheet)
-    if df.empty:
+    rows = load_sheet_rows(args.workbook, args.sheet)
+    if not rows:
         print("No data rows found.")
         sys.exit(1)
-    df = normalize_columns(df)
 
     if args.no_gui:
-        picked = df.tail(args.last) if args.last else df
+        picked = rows[-args.last:] if args.last else rows
     else:
-        picked = pick_rows_gui(df, last_n=args.last)
+        picked = pick_rows_gui(rows, last_n=args.last)
 
-    if picked is None or picked.empty:
+    if not picked:
         print("No rows selected.")
         return
 
     os.makedirs(args.output, exist_ok=True)
-    for _, row in picked.iterrows():
-        out_path = build_doc(row, args.output)
-        print(f"Created: {out_path}")
-        if args.print:
-            try_print_via_word(out_path)
+    word = open_word() if args.print else None
+    try:
+        for row in picked:
+            out_path = build_doc(row, args.output)
+            print(f"Created: {out_path}")
+            if args.print:
+                try_print_via_word(out_path, word)
+    finally:
+        if word is not None:
+            try:
+                word.Quit()
+            except Exception:
+                pass
 
     print(f"All summaries saved to: {os.path.abspath(args.output)}")
     if args.open:
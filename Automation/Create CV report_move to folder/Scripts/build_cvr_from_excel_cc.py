@@ -3,7 +3,10 @@ import re
 import sys
 import time
 import shutil
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from dateutil.tz import gettz
 
 import pandas as pd
@@ -12,6 +15,7 @@ import pandas as pd
 try:
     import win32com.client as win32
     import pythoncom
+    import pywintypes
 except ImportError:
     print("pywin32 is not installed. Run: python -m pip install pywin32")
     sys.exit(1)
@@ -23,6 +27,18 @@ except ImportError:
     print("openpyxl is not installed. Run: python -m pip install openpyxl")
     sys.exit(1)
 
+# --- lxml (ships with python-docx) to fill content controls straight in the .docx XML ---
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# --- rapidfuzz (optional, pip install rapidfuzz): last-resort fuzzy folder match ---
+try:
+    from rapidfuzz import fuzz, process as fuzz_process
+except ImportError:
+    fuzz_process = None
+
 # =========================
 # USER SETTINGS
 # =========================
@@ -54,6 +70,18 @@ OVERWRITE_POLICY = "rename"           # "skip" | "rename" | "overwrite"
 # Default dry-run; can be overridden by --dry-run / --real
 DRY_RUN = False
 
+# Fill content controls by patching the template XML (no Word); Word COM is only the fallback
+XML_FILL = True
+FILL_WORKERS = os.cpu_count() or 1    # processes for the direct fill; 1 = fill in this process
+# Fewer pending reports than this fill in this process: a fill is ~35 ms, while each spawned
+# worker re-imports pandas/lxml/win32com on Windows, which costs more than a few fills
+FILL_PARALLEL_MIN = 8
+
+# Only when no folder contains the cause/name text: accept a fuzzy last+first match scoring at
+# least this (rapidfuzz token_sort_ratio on the folder's name words, 0-100) and strictly above
+# the runner-up. None = off.
+FUZZY_FOLDER_CUTOFF = 90
+
 # Accept header variants for data fill & naming (case/space-insensitive)
 COLUMN_ALIASES = {
     "wlast": "wardlast",
@@ -67,165 +95,428 @@ COLUMN_ALIASES = {
 # =========================
 # HELPERS
 # =========================
+# Compiled once; these helpers run for every row x folder x field
+_RE_NONWORD  = re.compile(r"[^\w\s\-]")
+_RE_WS       = re.compile(r"\s+")
+_RE_FNCHARS  = re.compile(r'[<>:"/\\|?*]+')
+_FNCHARS     = frozenset('<>:"/\\|?*')
+# normalize_key deletes whitespace/underscores outright: translate with every char regex \s
+# matches (== str.isspace; all below U+3001) plus "_"
+_KEY_DELETE  = str.maketrans("", "", "".join(c for c in map(chr, range(0x3001)) if c.isspace()) + "_")
+
+@lru_cache(maxsize=None)   # same few column/CC names every row
 def normalize_key(s: str) -> str:
-    return re.sub(r"[\s_]+", "", str(s).strip().lower())
+    return str(s).strip().lower().translate(_KEY_DELETE)
 
 def build_header_map(columns):
     """Map normalized key -> actual Excel column name, honoring aliases when targets exist."""
-    m = {}
     norm_cols = {normalize_key(c): c for c in columns}
-    for c in columns:
-        m[normalize_key(c)] = c
+    m = dict(norm_cols)
     for alias, target in COLUMN_ALIASES.items():
         tgt_norm = normalize_key(target)
         if tgt_norm in norm_cols:
             m[normalize_key(alias)] = norm_cols[tgt_norm]
     return m
 
-def value_from_row(row, header_map, key):
-    col = header_map.get(normalize_key(key))
-    if col is None:
-        return ""
-    v = row.get(col, "")
+def cell_text(v) -> str:
     if pd.isna(v):
         return ""
     if isinstance(v, (pd.Timestamp, datetime)):
         return v.strftime("%m/%d/%Y")
     return str(v).strip()
 
-def first_nonempty(row, header_map, *keys):
+def field_positions(header_map, columns):
+    """(normalized key, slot) pairs for itertuples(index=True) rows; slot 0 is the index."""
+    pos = {c: i for i, c in enumerate(columns, 1)}
+    return [(key, pos[col]) for key, col in header_map.items() if col in pos]
+
+def row_values(row, positions):
+    """Normalized key (aliases included) -> cell text for one row; built once, then plain dict lookups."""
+    return {key: cell_text(row[i]) for key, i in positions}
+
+def value_from_row(values, key):
+    return values.get(normalize_key(key), "")
+
+def cc_value(values, name):
+    """Value for a content control titled/tagged `name`, with COLUMN_ALIASES as fallback."""
+    val = value_from_row(values, name)
+    if not val:
+        alias = COLUMN_ALIASES.get(name.lower())
+        if alias:
+            val = value_from_row(values, alias)
+    return val
+
+# Row fields used for naming/matching (first non-empty wins)
+LAST_KEYS  = ("wardlast", "wlast", "last", "lastname", "ward last")
+FIRST_KEYS = ("wardfirst", "wfirst", "first", "firstname", "ward first")
+CAUSE_KEYS = ("causeno", "cause number", "cause no", "cause")
+
+def wanted_keys(cc_names) -> set:
+    """Normalized header keys the run can read: naming fields, DONE column and CC names (+ aliases)."""
+    keys = {normalize_key(k) for k in (*LAST_KEYS, *FIRST_KEYS, *CAUSE_KEYS, DONE_COLUMN, *cc_names)}
+    keys |= {normalize_key(COLUMN_ALIASES[n.lower()]) for n in cc_names if n.lower() in COLUMN_ALIASES}
+    for alias, target in COLUMN_ALIASES.items():
+        if normalize_key(alias) in keys:
+            keys.add(normalize_key(target))
+    return keys
+
+def first_nonempty(values, *keys):
     for k in keys:
-        v = value_from_row(row, header_map, k)
+        v = value_from_row(values, k)
         if v:
             return v
     return ""
 
 def clean_segment(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return " ".join((s or "").split())
 
 def join_nonempty(parts, sep=", "):
-    parts = [clean_segment(p) for p in parts if clean_segment(p)]
-    return sep.join(parts)
+    return sep.join(filter(None, map(clean_segment, parts)))
 
 def safe_name(name: str) -> str:
     name = (name or "").strip().strip(".")
-    return re.sub(r'[<>:"/\\|?*]+', "_", name)
+    if _FNCHARS.isdisjoint(name):   # usual case: nothing to replace, skip the regex
+        return name
+    return _RE_FNCHARS.sub("_", name)
 
 def ensure_ext_docx(name: str) -> str:
     return name if name.lower().endswith(".docx") else name + ".docx"
 
+# Folder listings cached per run, so "(n)" rename probing is set lookups instead of a stat each
+_DIR_NAMES = {}
+
+def dir_names(folder: str) -> set:
+    """normcase'd entry names in folder (listed once, then kept current by claim_path)."""
+    key = os.path.normcase(os.path.abspath(folder))
+    names = _DIR_NAMES.get(key)
+    if names is None:
+        try:
+            names = {os.path.normcase(n) for n in os.listdir(folder)}
+        except Exception:
+            names = set()
+        _DIR_NAMES[key] = names
+    return names
+
+def path_taken(path: str) -> bool:
+    folder, name = os.path.split(path)
+    return os.path.normcase(name) in dir_names(folder)
+
+def claim_path(path: str):
+    folder, name = os.path.split(path)
+    dir_names(folder).add(os.path.normcase(name))
+
+def next_free_path(path: str) -> str:
+    """First "base (n).ext" (n >= 2) not taken in path's folder."""
+    folder, name = os.path.split(path)
+    names = dir_names(folder)
+    base, ext = os.path.splitext(name)
+    n = 2
+    while os.path.normcase(f"{base} ({n}){ext}") in names:
+        n += 1
+    return os.path.join(folder, f"{base} ({n}){ext}")
+
 def save_with_retry(doc, path, retries=3, delay=0.8):
+    """SaveAs2, retrying transient COM failures (e.g. AV/sync briefly locking the file).
+    COM is already initialized on this thread by start_word; other errors surface immediately."""
     for i in range(retries):
         try:
             doc.SaveAs2(path)
             return
-        except Exception:
+        except pywintypes.com_error:
             if i < retries - 1:
                 time.sleep(delay)
-                pythoncom.CoInitialize()
                 continue
             raise
 
+def move_to_destination(out_path, dest_path, final_folder, match_folder, file_name):
+    """Move a staged report into its person folder (or the base root) per OVERWRITE_POLICY."""
+    # We do NOT create person folders
+    target_path = dest_path
+    if path_taken(dest_path):
+        if OVERWRITE_POLICY == "skip":
+            print(f"  Destination exists -> skipping move: {dest_path}")
+            return
+        elif OVERWRITE_POLICY == "rename":
+            target_path = next_free_path(dest_path)
+        elif OVERWRITE_POLICY == "overwrite":
+            pass  # overwrite
+
+    if DRY_RUN:
+        print(f"  [DRY] Would move to: {target_path}")
+        return
+
+    # Only ensure folder exists if it's the base root; don't create person folders
+    if os.path.normcase(os.path.abspath(final_folder)) == os.path.normcase(os.path.abspath(DEST_BASE_FOLDER)):
+        os.makedirs(final_folder, exist_ok=True)
+    shutil.move(out_path, target_path)
+    claim_path(target_path)
+    print(f"  Moved to: {target_path}")
+
+    # Optional cleanup of stray root copy if we moved into a person folder
+    try:
+        if match_folder:
+            stray = os.path.join(DEST_BASE_FOLDER, file_name)
+            if os.path.exists(stray):
+                os.remove(stray)
+                dir_names(DEST_BASE_FOLDER).discard(os.path.normcase(file_name))
+                print("  Removed stray root copy:", stray)
+    except Exception:
+        pass
+
+# ---------- Direct .docx fill (no Word) ----------
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+_CC_SKIP_KINDS = {"checkbox", "picture"}   # non-text controls stay as the template has them
+
+def _w(tag: str) -> str:
+    return f"{{{W_NS}}}{tag}"
+
+def load_template_parts(path):
+    """Read the template zip once: [(ZipInfo, bytes)] in archive order + names of parts holding CCs."""
+    with zipfile.ZipFile(path) as z:
+        parts = [(info, z.read(info)) for info in z.infolist()]
+    cc_parts = [
+        info.filename for info, data in parts
+        if re.fullmatch(r"word/(document|header\d*|footer\d*)\.xml", info.filename) and b"<w:sdt" in data
+    ]
+    return parts, cc_parts
+
+def _cc_name(sdt_pr) -> str:
+    for tag in ("alias", "tag"):   # same precedence as cc.Title or cc.Tag
+        el = sdt_pr.find(_w(tag))
+        if el is not None and (el.get(_w("val")) or "").strip():
+            return el.get(_w("val")).strip()
+    return ""
+
+def _set_cc_text(sdt_pr, content, val: str):
+    """Replace a text CC's runs with `val` (line breaks -> <w:br/>), dropping placeholder state."""
+    ts = list(content.iter(_w("t")))
+    if not ts:
+        run = content.find(".//" + _w("r"))
+        if run is None:
+            return
+        ts = [etree.SubElement(run, _w("t"))]
+    for t in ts[1:]:
+        t.getparent().remove(t)
+
+    lines = val.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    t = ts[0]
+    t.text = lines[0]
+    t.set(_XML_SPACE, "preserve")
+    for line in lines[1:]:
+        br = etree.Element(_w("br"))
+        t.addnext(br)
+        t = etree.Element(_w("t"))
+        t.text = line
+        t.set(_XML_SPACE, "preserve")
+        br.addnext(t)
+
+    plc = sdt_pr.find(_w("showingPlcHdr"))
+    if plc is not None:
+        sdt_pr.remove(plc)
+    for style in content.iter(_w("rStyle")):
+        if style.get(_w("val")) == "PlaceholderText":
+            style.getparent().remove(style)
+
+def fill_cc_xml(xml_bytes: bytes, value_for) -> bytes:
+    root = etree.fromstring(xml_bytes)
+    for sdt in root.iter(_w("sdt")):
+        sdt_pr = sdt.find(_w("sdtPr"))
+        content = sdt.find(_w("sdtContent"))
+        if sdt_pr is None or content is None:
+            continue
+        if any(etree.QName(el).localname in _CC_SKIP_KINDS for el in sdt_pr):
+            continue
+        name = _cc_name(sdt_pr)
+        if not name:
+            continue
+        val = value_for(name)
+        if val:   # empty -> leave the template placeholder, as Word does for Range.Text = ""
+            _set_cc_text(sdt_pr, content, val)
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+def template_cc_names(template) -> set:
+    """Every titled/tagged CC name in the template (checkboxes included: the Word path sets those too)."""
+    parts, cc_parts = template
+    names = set()
+    for info, data in parts:
+        if info.filename in cc_parts:
+            for sdt_pr in etree.fromstring(data).iter(_w("sdtPr")):
+                name = _cc_name(sdt_pr)
+                if name:
+                    names.add(name)
+    return names
+
+def write_filled_docx(template, out_path, value_for):
+    """Write a copy of the template to out_path with every titled/tagged text CC filled."""
+    parts, cc_parts = template
+    patched = {name: None for name in cc_parts}
+    for info, data in parts:
+        if info.filename in patched:
+            patched[info.filename] = fill_cc_xml(data, value_for)
+    with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as z:
+        for info, data in parts:
+            z.writestr(info, patched.get(info.filename) or data)
+
+# Per-process template for fill workers (set by _init_fill_worker, or directly when serial)
+_FILL_TEMPLATE = None
+
+def _init_fill_worker(template_path):
+    global _FILL_TEMPLATE
+    _FILL_TEMPLATE = load_template_parts(template_path)
+
+def generate_one(out_path, values):
+    """Fill one report into staging; returns (out_path, error text or "")."""
+    try:
+        write_filled_docx(_FILL_TEMPLATE, out_path, lambda name: cc_value(values, name))
+        return out_path, ""
+    except Exception as e:
+        return out_path, str(e)
+
+def fill_staged(template, tasks):
+    """Direct-fill every (out_path, row values) task, across processes from FILL_PARALLEL_MIN tasks.
+    Returns the set of out_paths written; the rest are left for the Word fallback."""
+    global _FILL_TEMPLATE
+    paths = [out_path for out_path, _ in tasks]
+    rows = [values for _, values in tasks]
+    results = None
+    workers = min(FILL_WORKERS, len(tasks)) if len(tasks) >= FILL_PARALLEL_MIN else 1
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_fill_worker,
+                                     initargs=(TEMPLATE_PATH,)) as ex:
+                results = list(ex.map(generate_one, paths, rows))
+        except Exception as e:
+            print(f"WARNING: Parallel fill unavailable ({e}); filling in this process.")
+    if results is None:
+        _FILL_TEMPLATE = template
+        results = [generate_one(p, r) for p, r in zip(paths, rows)]
+
+    filled = set()
+    for out_path, err in results:
+        if err:
+            print(f"  WARNING: Direct fill failed for {out_path} ({err}); falling back to Word.")
+        else:
+            filled.add(out_path)
+            print(f"  Saved in staging: {out_path}")
+    return filled
+
 # ---------- Folder matching by fields (cause first, then name) ----------
 def norm_text(s: str) -> str:
     s = (s or "").lower()
     s = s.replace("–", "-").replace("—", "-")
-    s = re.sub(r"[^\w\s\-]", " ", s)   # drop punctuation to spaces
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _RE_NONWORD.sub(" ", s)   # drop punctuation to spaces
+    s = _RE_WS.sub(" ", s).strip()
     return s
 
 def digits_only(s: str) -> str:
-    return re.sub(r"\D+", "", s or "")
+    return "".join(filter(str.isdecimal, s or ""))  # isdecimal == regex \d for str
 
-def find_person_folder(base: str, cause: str, last: str, first: str) -> str | None:
-    """Return best match subfolder path using cause # first, then last/first tokens."""
+_FOLDER_SCANS = {}
+
+def scan_base(base: str) -> list:
+    """List subfolders of base once per run, with normalized forms precomputed for matching."""
+    key = os.path.normcase(os.path.abspath(base))
+    if key in _FOLDER_SCANS:
+        return _FOLDER_SCANS[key]
+    folders = []
     try:
         entries = [d for d in os.listdir(base) if os.path.isdir(os.path.join(base, d))]
     except Exception:
-        return None
-
-    if not entries:
-        return None
-
-    # Precompute normalized forms of each folder
-    folders = []
-    for d in entries:
-        p = os.path.join(base, d)
+        entries = []
+    for d in sorted(entries):  # name order: find_person_folder's tie-break relies on it
         folders.append({
-            "path": p,
+            "path": os.path.join(base, d),
             "name": d,
             "norm": norm_text(d),
             "digits": digits_only(d)
         })
+    _FOLDER_SCANS[key] = folders
+    return folders
+
+# Trigram index: every folder whose text contains q also contains all of q's trigrams,
+# so intersecting posting sets gives a small candidate set for the exact substring test.
+_NGRAM = 3
+
+def _ngrams(s: str) -> set:
+    return {s[i:i + _NGRAM] for i in range(len(s) - _NGRAM + 1)}
+
+def build_folder_index(folders: list) -> dict:
+    """{"norm"|"digits": {trigram: set(folder positions)}} built once per run."""
+    index = {"norm": {}, "digits": {}}
+    for i, f in enumerate(folders):
+        for field, postings in index.items():
+            for g in _ngrams(f[field]):
+                postings.setdefault(g, set()).add(i)
+    return index
+
+def find_person_folder(folders: list, cause: str, last: str, first: str, index: dict | None = None) -> str | None:
+    """Return best match subfolder path using cause # first, then last/first tokens.
+
+    Single pass over every folder that matches anything, ranked (tier, score): any cause hit
+    beats name-only hits. Cause tier scores +3 digits-only containment, +2 normalized
+    containment, +1 each for last/first; name-only tier is last+first > last > first.
+    Folders come in name order (scan_base), so keeping the first best is the name tie-break.
+    """
+    if not folders:
+        return None
 
-    # 1) Prefer cause number match (unique)
-    cause_norm = norm_text(cause)
-    cause_dig  = digits_only(cause)
-
-    by_cause = []
-    if cause_norm or cause_dig:
-        for f in folders:
-            score = 0
-            # hyphen/spacing tolerant: substring in normalized text
-            if cause_norm and cause_norm in f["norm"]:
-                score += 2
-            # punctuation tolerant: digits-only containment
-            if cause_dig and cause_dig and cause_dig in f["digits"]:
-                score += 3
-            if score:
-                by_cause.append((score, f))
-
-        if by_cause:
-            # tie-break with last/first hints if present
-            last_tok  = norm_text(last)
-            first_tok = norm_text(first)
-            boosted = []
-            for score, f in by_cause:
-                if last_tok and last_tok in f["norm"]:
-                    score += 1
-                if first_tok and first_tok in f["norm"]:
-                    score += 1
-                boosted.append((score, f))
-            boosted.sort(key=lambda x: (-x[0], x[1]["name"]))
-            return boosted[0][1]["path"]
-
-    # 2) If no cause hit, try last+first together, then last-only, then first-only
-    last_tok  = norm_text(last)
-    first_tok = norm_text(first)
-
-    def pick_best(cands):
-        if not cands:
-            return None
-        cands.sort(key=lambda x: (-x[0], x[1]["name"]))
-        return cands[0][1]["path"]
-
-    both = []
-    if last_tok and first_tok:
-        for f in folders:
-            if last_tok in f["norm"] and first_tok in f["norm"]:
-                both.append((2, f))
-        p = pick_best(both)
-        if p:
-            return p
-
-    only_last = []
-    if last_tok:
-        for f in folders:
-            if last_tok in f["norm"]:
-                only_last.append((1, f))
-        p = pick_best(only_last)
-        if p:
-            return p
-
-    only_first = []
-    if first_tok:
-        for f in folders:
-            if first_tok in f["norm"]:
-                only_first.append((1, f))
-        p = pick_best(only_first)
-        if p:
-            return p
-
+    def hits(field: str, q: str) -> set:
+        """Positions of folders whose `field` contains q (substring), narrowed via the trigram index when possible."""
+        if not q:
+            return set()
+        grams = _ngrams(q) if index is not None else set()
+        if grams:
+            postings = sorted((index[field].get(g, set()) for g in grams), key=len)
+            pool = set.intersection(*postings)
+        else:
+            pool = range(len(folders))  # query shorter than a trigram (or no index): plain scan
+        return {i for i in pool if q in folders[i][field]}
+
+    cause_norm = norm_text(cause)   # hyphen/spacing tolerant
+    cause_dig  = digits_only(cause)  # punctuation tolerant
+    last_tok   = norm_text(last)
+    first_tok  = norm_text(first)
+
+    # Digits of a substring are a substring of the digits, so every normalized cause hit is also
+    # a digit hit: a single digit hit is the only cause-tier folder and wins outright.
+    digit_hits = hits("digits", cause_dig)
+    if len(digit_hits) == 1:
+        return folders[next(iter(digit_hits))]["path"]
+
+    norm_hits  = hits("norm", cause_norm)
+    last_hits  = hits("norm", last_tok)
+    first_hits = hits("norm", first_tok)
+
+    ceiling = (1, 2 * bool(norm_hits) + 3 * bool(digit_hits) + bool(last_hits) + bool(first_hits))  # best possible
+    best, best_rank = None, None
+    for i in sorted(norm_hits | digit_hits | last_hits | first_hits):
+        in_last, in_first = i in last_hits, i in first_hits
+        if i in norm_hits or i in digit_hits:
+            rank = (1, 2 * (i in norm_hits) + 3 * (i in digit_hits) + in_last + in_first)
+        else:
+            rank = (0, 2 if in_last and in_first else 1 if in_last else 0)
+        if best_rank is None or rank > best_rank:
+            best, best_rank = i, rank
+            if rank == ceiling:
+                break
+
+    if best is not None:
+        return folders[best]["path"]
+    return fuzzy_person_folder(folders, last_tok, first_tok)
+
+def fuzzy_person_folder(folders: list, last_tok: str, first_tok: str) -> str | None:
+    """Typo/diacritic-tolerant fallback: unique best last+first score at or above FUZZY_FOLDER_CUTOFF."""
+    if fuzz_process is None or not FUZZY_FOLDER_CUTOFF or not (last_tok and first_tok):
+        return None
+    # Score against name words only; the cause digits in folder names would dilute every score
+    choices = [" ".join(w for w in f["norm"].split() if not any(c.isdigit() for c in w)) for f in folders]
+    top = fuzz_process.extract(
+        f"{last_tok} {first_tok}", choices,
+        scorer=fuzz.token_sort_ratio, score_cutoff=FUZZY_FOLDER_CUTOFF, limit=2,
+    )
+    if top and (len(top) == 1 or top[0][1] > top[1][1]):
+        return folders[top[0][2]]["path"]
     return None
 
 # ---------- Excel (non-destructive) ----------
@@ -267,6 +558,24 @@ def write_values(ws, col_idx: int, df_index_list, value: str):
 # =========================
 # MAIN
 # =========================
+def start_word(saved_options):
+    """Hidden Word with alerts, repaint and as-you-type proofing off (caller restores saved_options)."""
+    pythoncom.CoInitialize()
+    word = win32.Dispatch("Word.Application")
+    word.Visible = False
+    try:
+        word.DisplayAlerts = 0
+    except Exception:
+        pass
+    try:
+        word.ScreenUpdating = False
+        for opt in ("CheckSpellingAsYouType", "CheckGrammarAsYouType"):
+            saved_options[opt] = getattr(word.Options, opt)
+            setattr(word.Options, opt, False)
+    except Exception:
+        pass
+    return word
+
 def main():
     global DRY_RUN
     # CLI overrides for dry-run
@@ -292,37 +601,56 @@ def main():
     print(f"Dest base (folders must already exist): {DEST_BASE_FOLDER}")
     print(f"Mode: {'DRY RUN' if DRY_RUN else 'REAL RUN'}")
 
-    # Read (pandas only for reading)
-    df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_NAME, engine="openpyxl")
+    # Template parts are read once; Word is only started if a row needs the COM fallback
+    template = None
+    if XML_FILL and etree is not None:
+        try:
+            template = load_template_parts(TEMPLATE_PATH)
+        except Exception as e:
+            print(f"WARNING: Could not read template for direct fill ({e}); using Word.")
+
+    # Read (pandas only for reading); with the template's CC names known, only the columns we use
+    usecols = None
+    if template is not None:
+        keys = wanted_keys(template_cc_names(template))
+        usecols = lambda c: normalize_key(c) in keys
+    df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_NAME, engine="openpyxl", usecols=usecols)
     if DONE_COLUMN not in df.columns:
         df[DONE_COLUMN] = ""
 
     header_map = build_header_map(df.columns)
 
-    # Rows to process: DONE column is blank (no 'Y' yet)
-    done_blank = df[DONE_COLUMN].isna() | (df[DONE_COLUMN].astype(str).str.strip() == "")
+    # Rows to process: DONE column is blank (no 'Y' yet); NaN -> "" so one string pass covers both
+    done_blank = df[DONE_COLUMN].astype("string").fillna("").str.strip().eq("").astype(bool)
     todo = df[done_blank].copy()
     if todo.empty:
         print("No new rows to process.")
         return
 
-    # Start Word
-    pythoncom.CoInitialize()
-    word = win32.Dispatch("Word.Application")
-    word.Visible = False
+    word = None
+    doc = None              # single Word document, re-filled and re-saved per row (fallback only)
+    saved_options = {}
     try:
-        try:
-            word.DisplayAlerts = 0
-        except Exception:
-            pass
-
         processed_idx = []  # rows we will mark with 'Y'
+        cc_names = None     # CC titles/tags are identical for every doc from TEMPLATE_PATH: read once
+        pending = None      # (idx, move args) for the staged file Word still holds open
+
+        # Person folders are listed/normalized/indexed once, not per row
+        folders = scan_base(DEST_BASE_FOLDER)
+        folder_index = build_folder_index(folders)
+
+        # Pass 1: fields, folder match and a unique staging path per row (no file I/O yet)
+        jobs = []           # (idx, row values, out_path, move_args)
+        reserved = set()    # staging paths claimed this run, so parallel fills never collide
+        positions = field_positions(header_map, todo.columns)
+        for row in todo.itertuples(index=True, name=None):
+            idx = row[0]
+            values = row_values(row, positions)
 
-        for idx, row in todo.iterrows():
             # Pull fields
-            last  = first_nonempty(row, header_map, "wardlast", "wlast", "last", "lastname", "ward last")
-            first = first_nonempty(row, header_map, "wardfirst", "wfirst", "first", "firstname", "ward first")
-            cause = first_nonempty(row, header_map, "causeno", "cause number", "cause no", "cause")
+            last  = first_nonempty(values, *LAST_KEYS)
+            first = first_nonempty(values, *FIRST_KEYS)
+            cause = first_nonempty(values, *CAUSE_KEYS)
 
             display_folder = join_nonempty([last, first, cause])
             if not display_folder:
@@ -333,7 +661,7 @@ def main():
             file_name  = ensure_ext_docx(safe_name(f"{display_folder} Court Visitor Report"))
 
             # === NEW: find person folder using cause first, then name tokens ===
-            match_folder = find_person_folder(DEST_BASE_FOLDER, cause, last, first)
+            match_folder = find_person_folder(folders, cause, last, first, folder_index)
             final_folder = match_folder if match_folder else DEST_BASE_FOLDER
             dest_path    = os.path.join(final_folder, file_name)
 
@@ -348,97 +676,109 @@ def main():
             print(f"  File name : {file_name}")
             print(f"  Final path: {dest_path}")
 
-            # Create the Word doc in STAGING
+            # Nothing to generate when the move would be skipped anyway
+            if OVERWRITE_POLICY == "skip" and path_taken(dest_path):
+                print("  Destination exists -> skipping generation and move.")
+                processed_idx.append(idx)
+                continue
+
             if DRY_RUN:
                 print(f"  [DRY] Would create in staging: {staging_path}")
             else:
                 # Handle staging overwrite for repeated tests
-                if os.path.exists(staging_path):
+                if path_taken(staging_path):
                     if OVERWRITE_POLICY == "skip":
                         print("  Staging exists -> skipping generation (will still attempt move).")
                     elif OVERWRITE_POLICY == "rename":
-                        base, ext = os.path.splitext(staging_path)
-                        n = 2
-                        while True:
-                            cand = f"{base} ({n}){ext}"
-                            if not os.path.exists(cand):
-                                out_path = cand
-                                print(f"  Staging exists -> renaming to: {out_path}")
-                                break
-                            n += 1
+                        out_path = None
                     elif OVERWRITE_POLICY == "overwrite":
                         print("  Staging exists -> overwriting.")
-
-                # Generate
-                doc = word.Documents.Add(Template=TEMPLATE_PATH)
+                if out_path is None or os.path.normcase(out_path) in reserved:
+                    out_path = next_free_path(staging_path)
+                    print(f"  Staging name in use -> renaming to: {out_path}")
+                reserved.add(os.path.normcase(out_path))
+                claim_path(out_path)
+
+            jobs.append((idx, values, out_path, (out_path, dest_path, final_folder, match_folder, file_name)))
+
+        # Pass 2: direct fills run in parallel (each worker holds its own template copy)
+        filled = set()
+        if template is not None and jobs and not DRY_RUN:
+            filled = fill_staged(template, [(out_path, values) for _, values, out_path, _ in jobs])
+
+        # Pass 3, in row order: Word fallback for anything not filled directly, then move
+        for idx, values, out_path, move_args in jobs:
+            held_by_word = False
+            if not DRY_RUN and out_path not in filled:
+                # Word fallback (one document for the whole run; every titled CC is rewritten per row)
+                if word is None:
+                    word = start_word(saved_options)
+                if doc is None:
+                    doc = word.Documents.Add(Template=TEMPLATE_PATH)
                 try:
-                    for cc in doc.ContentControls:
-                        name = (cc.Title or cc.Tag or "").strip()
+                    ccs = list(doc.ContentControls)
+                    if cc_names is None or len(cc_names) != len(ccs):
+                        cc_names = [(cc.Title or cc.Tag or "").strip() for cc in ccs]
+                    for name, cc in zip(cc_names, ccs):
                         if not name:
                             continue
-                        val = value_from_row(row, header_map, name)
-                        if not val:
-                            alias = COLUMN_ALIASES.get(name.lower())
-                            if alias:
-                                val = value_from_row(row, header_map, alias)
                         try:
-                            cc.Range.Text = val
+                            cc.Range.Text = cc_value(values, name)
                         except Exception:
                             pass
                 except Exception as e:
                     print(f"  WARNING: Could not iterate/fill content controls: {e}")
 
+                # SaveAs2 re-points the open doc at out_path, which releases the previous row's file
                 save_with_retry(doc, out_path)
-                doc.Close(False)
-                print(f"  Saved in staging: {out_path}")
-
-            # Move to final destination (we do NOT create person folders)
-            target_path = dest_path
-            if os.path.exists(dest_path):
-                if OVERWRITE_POLICY == "skip":
-                    print("  Destination exists -> skipping move.")
-                    processed_idx.append(idx)
-                    continue
-                elif OVERWRITE_POLICY == "rename":
-                    base, ext = os.path.splitext(dest_path)
-                    n = 2
-                    while True:
-                        cand = f"{base} ({n}){ext}"
-                        if not os.path.exists(cand):
-                            target_path = cand
-                            break
-                        n += 1
-                elif OVERWRITE_POLICY == "overwrite":
-                    pass  # overwrite
-
-            if DRY_RUN:
-                print(f"  [DRY] Would move to: {target_path}")
-            else:
-                # Only ensure folder exists if it's the base root; don't create person folders
-                if os.path.normcase(os.path.abspath(final_folder)) == os.path.normcase(os.path.abspath(DEST_BASE_FOLDER)):
-                    os.makedirs(final_folder, exist_ok=True)
-                shutil.move(out_path, target_path)
-                print(f"  Moved to: {target_path}")
-
-                # Optional cleanup of stray root copy if we moved into a person folder
                 try:
-                    if match_folder:
-                        stray = os.path.join(DEST_BASE_FOLDER, file_name)
-                        if os.path.exists(stray):
-                            os.remove(stray)
-                            print("  Removed stray root copy:", stray)
+                    doc.UndoClear()
                 except Exception:
                     pass
-
-            # Mark as processed (we generated and moved)
-            processed_idx.append(idx)
+                held_by_word = True
+                print(f"Row {idx} saved in staging (Word): {out_path}")
+
+            # The previous Word row's file is released only by this row's SaveAs2 (or the final
+            # Close); a directly filled row leaves it open, so its move waits
+            if pending and held_by_word:
+                move_to_destination(*pending[1])
+                processed_idx.append(pending[0])
+                pending = None
+
+            if held_by_word:
+                # Word keeps this file open until the next SaveAs2 / Close: move it then
+                pending = (idx, move_args)
+            else:
+                print(f"Row {idx}:")
+                move_to_destination(*move_args)
+                # Mark as processed (we generated and moved)
+                processed_idx.append(idx)
+
+        if doc is not None:
+            doc.Close(False)
+            doc = None
+        if pending:
+            move_to_destination(*pending[1])
+            processed_idx.append(pending[0])
 
     finally:
-        try:
-            word.Quit()
-        except Exception:
-            pass
-        pythoncom.CoUninitialize()
+        if word is not None:
+            if doc is not None:
+                try:
+                    doc.Close(False)
+                except Exception:
+                    pass
+            try:
+                for opt, value in saved_options.items():
+                    setattr(word.Options, opt, value)
+                word.ScreenUpdating = True
+            except Exception:
+                pass
+            try:
+                word.Quit()
+            except Exception:
+                pass
+            pythoncom.CoUninitialize()
 
     # Non-destructive Excel write-back (only in REAL RUN)
     if processed_idx and not DRY_RUN:
@@ -453,6 +793,9 @@ def main():
         except Exception as e:
             print(f"Backup skipped: {e}")
 
+        # Full-DOM load on purpose: a read_only -> write_only streaming rewrite would drop
+        # styles, column widths, validations, other sheets' formatting and formula caches.
+        # This runs once per run (all marks in one save), after Word is closed.
         wb = load_workbook(EXCEL_PATH)
         if SHEET_NAME not in wb.sheetnames:
             wb.close()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+r"""
+email_utils.py
+Shared helpers for the meeting-request senders (scripts/send_guardian_emails.py and
+the older ../send_guardian_emails.py):
+- Sheet1 loading and vectorized email cleaning/validation
+- Week/day prompt
+- Gmail auth, MIME building, rate-limited batch sends with retry
+- Case-folder lookup and .txt copies
+"""
+
+import os
+import re
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta, date
+from functools import lru_cache
+from pathlib import Path
+from string import Formatter
+from dateutil.relativedelta import relativedelta, MO
+import pandas as pd
+try:
+    import python_calamine  # noqa: F401  (optional, fast xlsx reader)
+    CALAMINE = True
+except ImportError:
+    CALAMINE = False
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from email.header import Header
+import base64
+
+from openpyxl import load_workbook
+
+SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
+
+# Calls/sec that stay under Gmail's 250 units/user/sec (send = 100 units, draft = 10)
+GMAIL_RPS      = {"send": 2.0, "draft": 20.0}
+# Calls per batch request: a batch's calls all land at once, so one batch must fit in a
+# second's quota by itself (2 sends = 200 units, 20 drafts = 200 units)
+GMAIL_BATCH    = {"send": 2, "draft": 20}
+GMAIL_WORKERS  = 8         # batches in flight at once
+GMAIL_RETRIES  = 5         # retry rounds for retriable responses
+# A send can 5xx after Gmail already delivered it, so sends only retry 429 (never duplicate an email);
+# drafts are harmless to repeat and also retry 5xx
+RETRY_STATUS   = {"send": frozenset({429}), "draft": frozenset({429, 500, 502, 503, 504})}
+BACKOFF_MAX    = 30.0      # seconds
+
+# Email cleaning/validation
+INVALID_MARKERS = frozenset({"none", "n/a", "na", "null", "nan", "(none)", "-"})
+
+EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+\-']+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+
+def clean_email_series(values: pd.Series) -> pd.Series:
+    """Clean an email column: drop NBSP/zero-width chars, strip spaces and ",;", lowercase;
+    INVALID_MARKERS ("n/a", "none", ...) become ""."""
+    s = (values.astype("string").fillna("")
+         .str.replace("\u00A0", " ", regex=False)
+         .str.replace("\u200B", "", regex=False)
+         .str.strip().str.strip(",;").str.lower())
+    return s.where(~s.isin(INVALID_MARKERS), "")
+
+def blank_mask(values: pd.Series) -> pd.Series:
+    """True where the cell is NaN or whitespace-only."""
+    blank = values.isna().to_numpy(copy=True)
+    # only str cells can be whitespace-only; numbers/dates are never stringified
+    present = ~blank
+    blank[present] = [isinstance(v, str) and not v.strip() for v in values.to_numpy()[present]]
+    return pd.Series(blank, index=values.index)
+
+def stripped_text_frame(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """str(...).strip() for whole columns at once; NaN/missing -> ""."""
+    text = df.reindex(columns=columns).astype("string").fillna("")
+    return text.apply(lambda s: s.str.strip()).astype(object)
+
+def load_sheet1(path, sheet_name):
+    """Sheet as a DataFrame. Uses pd.read_excel's Rust calamine engine when python-calamine
+    is installed (pandas >= 2.2); otherwise one read-only openpyxl pass (no styles),
+    with pd.read_excel(engine="openpyxl") as the last fallback."""
+    if CALAMINE:
+        try:
+            # raw cell text like the openpyxl pass ("n/a" stays "n/a", not NaN)
+            df = pd.read_excel(path, sheet_name=sheet_name, engine="calamine", keep_default_na=False)
+            df.columns = [str(c).strip() for c in df.columns]
+            return df
+        except Exception:
+            pass  # older pandas without the engine, or a file calamine rejects
+    try:
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb[sheet_name].iter_rows(values_only=True)
+            header = next(rows, ())
+            data = list(rows)
+        finally:
+            wb.close()
+    except Exception:
+        df = pd.read_excel(path, sheet_name=sheet_name, engine="openpyxl")
+        df.columns = [str(c).strip() for c in df.columns]
+        return df
+
+    # Same column names pd.read_excel would give: blank -> "Unnamed: i", repeats -> "name.1"
+    columns, seen = [], {}
+    for i, c in enumerate(header):
+        name = str(c).strip() if c is not None else f"Unnamed: {i}"
+        n = seen.get(name, 0)
+        seen[name] = n + 1
+        columns.append(f"{name}.{n}" if n else name)
+    width = len(columns)
+    while data and all(v is None for v in data[-1]):   # formatted-but-empty tail rows
+        data.pop()
+    data = [tuple(r[:width]) + (None,) * (width - len(r)) for r in data]
+    return pd.DataFrame(data, columns=columns)
+
+def choose_week_and_days():
+    today = date.today()
+    next_mon = today + relativedelta(weekday=MO(+1))
+    next_sun = next_mon + timedelta(days=6)
+    default_week = f"{next_mon.isoformat()}..{next_sun.isoformat()}"
+    default_days = "Wed,Thu"
+
+    print(f"\nProposed week: {default_week}  (Mon..Sun)")
+    week_in = input("Use this week? Press Enter, or enter YYYY-MM-DD..YYYY-MM-DD: ").strip()
+    if not week_in:
+        week_in = default_week
+
+    days_in = input(f"Preferred days (comma) [default {default_days}]: ").strip()
+    if not days_in:
+        days_in = default_days
+
+    try:
+        start_s, end_s = week_in.split("..")
+        start_d = date.fromisoformat(start_s)
+        end_d = date.fromisoformat(end_s)
+        week_phrase = "next week" if (start_d == next_mon and end_d == next_sun) \
+                      else f"the week of {start_d.strftime('%b %d')}–{end_d.strftime('%b %d')}"
+    except Exception:
+        week_phrase = "next week"
+
+    days_list = [d.strip() for d in days_in.split(",") if d.strip()]
+    preferred_days_short = "/".join(days_list)
+    preferred_days_phrase = ", ".join(days_list)
+
+    return week_phrase, preferred_days_phrase, preferred_days_short
+
+def gmail_credentials(client_secrets, token_path):
+    """Creds from token_path (refreshed, or a fresh OAuth flow with client_secrets); saved back to token_path."""
+    creds = None
+    token_path = Path(token_path)
+
+    if token_path.exists():
+        creds = Credentials.from_authorized_user_file(str(token_path), SCOPES)
+
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+            except Exception as e:
+                # Token refresh failed (expired/revoked) - delete and re-authenticate
+                print(f"Token refresh failed: {e}")
+                print("Deleting expired token and starting fresh OAuth flow...")
+                if token_path.exists():
+                    token_path.unlink()
+                creds = None  # Force re-auth below
+
+        if not creds:
+            flow = InstalledAppFlow.from_client_secrets_file(client_secrets, SCOPES)
+            creds = flow.run_local_server(port=0)
+
+        with open(token_path, "w", encoding="utf-8") as f:
+            f.write(creds.to_json())
+    return creds
+
+def gmail_service(creds):
+    return build("gmail", "v1", credentials=creds)
+
+# httplib2 is not thread-safe: each worker thread builds its own service from the shared creds
+_thread_local = threading.local()
+
+def thread_gmail_service(creds):
+    service = getattr(_thread_local, "gmail", None)
+    if service is None:
+        service = gmail_service(creds)
+        _thread_local.gmail = service
+    return service
+
+def compile_template(template):
+    """template.format(**kw) with the template parsed once: each call only joins the
+    literal pieces and values (~3x faster than str.format for the email body).
+    Templates with format specs, conversions or attribute/index fields keep str.format."""
+    pieces = list(Formatter().parse(template))
+    if any(spec or conv or not name.isidentifier()
+           for _, name, spec, conv in pieces if name is not None):
+        return lambda **kw: template.format(**kw)
+
+    def render(**kw):
+        out = []
+        for literal, name, _, _ in pieces:
+            out.append(literal)
+            if name is not None:
+                out.append(str(kw[name]))
+        return "".join(out)
+    return render
+
+# Header block MIMEText(body, "plain", "utf-8") emits; only To/Cc/Subject vary per message
+MIME_HEADER = (
+    b'Content-Type: text/plain; charset="utf-8"\n'
+    b"MIME-Version: 1.0\n"
+    b"Content-Transfer-Encoding: base64\n"
+)
+
+def header_value(name, value) -> bytes:
+    """Header value on one line (no CR/LF injection); RFC 2047 encoded when not ASCII."""
+    value = " ".join(str(value).splitlines())
+    if value.isascii():
+        return value.encode("ascii")
+    return Header(value, "utf-8", header_name=name).encode().encode("ascii")
+
+def build_message(to_email, subject, body, cc_email=None):
+    parts = [MIME_HEADER, b"To: ", header_value("To", to_email), b"\n"]
+    if cc_email:
+        parts += [b"Cc: ", header_value("Cc", cc_email), b"\n"]
+    parts += [b"Subject: ", header_value("Subject", subject), b"\n\n", base64.encodebytes(body.encode("utf-8"))]
+    raw = base64.urlsafe_b64encode(b"".join(parts)).decode("ascii")
+    return {"raw": raw}
+
+def gmail_request(service, mode, message):
+    if mode == "draft":
+        return service.users().drafts().create(userId="me", body={"message": message})
+    return service.users().messages().send(userId="me", body=message)
+
+@dataclass
+class RateLimiter:
+    """Paces calls to `rps` per second; a batch of n calls takes n slots."""
+    rps: float
+    next_free: float = field(default=0.0)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def acquire(self, n=1):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_free)
+            self.next_free = start + n / self.rps
+        if start > now:
+            time.sleep(start - now)
+
+def retry_after(error, mode):
+    """Retry-After seconds from an HttpError retriable in this mode, 0.0 if none; None if not retriable."""
+    if not isinstance(error, HttpError) or error.resp.status not in RETRY_STATUS[mode]:
+        return None
+    try:
+        return float(error.resp.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+def run_batch(creds, mode, chunk, limiter):
+    """One Gmail batch call for (request_id, message) pairs on this thread's service."""
+    service = thread_gmail_service(creds)  # a batch goes out on its first request's http
+    results = {}
+
+    def on_resp(request_id, response, exception):
+        results[request_id] = exception
+
+    limiter.acquire(len(chunk))
+    batch = service.new_batch_http_request(callback=on_resp)
+    for request_id, message in chunk:
+        batch.add(gmail_request(service, mode, message), request_id=request_id)
+    try:
+        batch.execute()
+    except Exception as e:
+        # whole batch failed in transport; every call in it gets the error
+        for request_id, _ in chunk:
+            results[request_id] = e
+    return results
+
+def execute_batched(creds, mode, messages, limiter):
+    """Send (request_id, message) pairs as Gmail batch calls on GMAIL_WORKERS threads,
+    retrying RETRY_STATUS[mode] with exponential backoff. Returns {request_id: exception or None}."""
+    results = {}
+    pending = messages
+    size = GMAIL_BATCH[mode]
+    with ThreadPoolExecutor(max_workers=GMAIL_WORKERS) as ex:
+        for attempt in range(GMAIL_RETRIES + 1):
+            chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+            for part in ex.map(lambda chunk: run_batch(creds, mode, chunk, limiter), chunks):
+                results.update(part)
+
+            waits = {rid: retry_after(results.get(rid), mode) for rid, _ in pending}
+            pending = [(rid, msg) for rid, msg in pending if waits[rid] is not None]
+            if not pending or attempt == GMAIL_RETRIES:
+                break
+            delay = min(BACKOFF_MAX, 2 ** attempt + random.uniform(0, 1))
+            delay = max([delay] + [waits[rid] for rid, _ in pending])
+            print(f"Gmail rate-limited/unavailable on {len(pending)} call(s); retrying in {delay:.1f}s")
+            time.sleep(delay)
+    return results
+
+@lru_cache(maxsize=None)
+def case_folder_index(base_dir):
+    """DirEntry objects of base_dir from one scandir; listed once per process and
+    shared by every caller."""
+    try:
+        with os.scandir(base_dir) as it:
+            return tuple(it)
+    except FileNotFoundError:
+        return ()
+
+def find_case_folder(folder_index, cause_no):
+    needle = str(cause_no)
+    for entry in folder_index:
+        # substring test first; is_dir() (cached on the DirEntry) only for name matches
+        if needle in entry.name and entry.is_dir():
+            return entry.path
+    return None
+
+_MADE_DIRS = set()  # folders already created this run
+
+def save_text_copy(folder, filename, subject, body, to_email, cc_email):
+    if folder not in _MADE_DIRS:
+        os.makedirs(folder, exist_ok=True)
+        _MADE_DIRS.add(folder)
+    out_path = os.path.join(folder, filename)
+    parts = [f"TO: {to_email}\n"]
+    if cc_email:
+        parts.append(f"CC: {cc_email}\n")
+    parts += [f"SUBJECT: {subject}\n\n", body]
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write("".join(parts))
+    return out_path
@@ -13,21 +13,18 @@ send_guardian_emails.py (Sheet1-only, SAFE WRITE)
 
 import os
 import sys
-import time
 import argparse
-import re
+import csv
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta, MO
 import pandas as pd
 from pathlib import Path
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from email.mime.text import MIMEText
-import base64
+from email_utils import (
+    EMAIL_RE, GMAIL_RPS, RateLimiter, blank_mask, build_message, case_folder_index,
+    choose_week_and_days, clean_email_series, compile_template, execute_batched, find_case_folder,
+    gmail_credentials, load_sheet1, save_text_copy, stripped_text_frame,
+)
 
 from openpyxl import load_workbook  # surgical Excel write (only 'emailsent')
 
@@ -54,7 +51,6 @@ SHEET1_NAME   = "Sheet1"
 TIMEZONE      = "America/Chicago"
 
 DEFAULT_MODE   = "draft"   # "draft" or "send" (default safe)
-THROTTLE_SEC   = 2.0
 LIMIT_DEFAULT  = 999999
 EMAIL_SENT_COL = "emailsent"  # created if missing; updated only with --confirm-write
 
@@ -90,8 +86,7 @@ COLS = {
     "date_submitted": "datesubmitted",  # trigger; NEVER modify
 }
 
-# Gmail OAuth - check app Config folder first, then fall back to configlocal
-SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
+# Gmail OAuth (scopes in email_utils) - check app Config folder first, then fall back to configlocal
 
 # Try app Config folder first
 APP_CONFIG_DIR = str(_CONFIG_DIR / "API")
@@ -111,172 +106,100 @@ else:
     TOKEN_PATH = LEGACY_TOKEN_PATH
 # ======================================
 
-# Email cleaning/validation
-INVALID_MARKERS = {"none", "n/a", "na", "null", "nan", "(none)", "-"}
-
-EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+\-']+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
-
-def clean_email(value) -> str:
-    if value is None:
-        return ""
-    s = str(value)
-    s = s.replace("\u00A0", " ").replace("\u200B", "").strip()
-    s = s.strip().strip(",;")
-    s = s.lower()
-    if s in INVALID_MARKERS:
-        return ""
-    return s
-
-def is_valid_email(s: str) -> bool:
-    return bool(s and EMAIL_RE.match(s))
-
-def load_sheet1(path, sheet_name):
-    df = pd.read_excel(path, sheet_name=sheet_name, engine="openpyxl")
-    df.columns = [str(c).strip() for c in df.columns]
-    return df
-
-def choose_week_and_days():
-    today = date.today()
-    next_mon = today + relativedelta(weekday=MO(+1))
-    next_sun = next_mon + timedelta(days=6)
-    default_week = f"{next_mon.isoformat()}..{next_sun.isoformat()}"
-    default_days = "Wed,Thu"
-
-    print(f"\nProposed week: {default_week}  (Mon..Sun)")
-    week_in = input("Use this week? Press Enter, or enter YYYY-MM-DD..YYYY-MM-DD: ").strip()
-    if not week_in:
-        week_in = default_week
-
-    days_in = input(f"Preferred days (comma) [default {default_days}]: ").strip()
-    if not days_in:
-        days_in = default_days
-
-    try:
-        start_s, end_s = week_in.split("..")
-        start_d = date.fromisoformat(start_s)
-        end_d = date.fromisoformat(end_s)
-        week_phrase = "next week" if (start_d == next_mon and end_d == next_sun) \
-                      else f"the week of {start_d.strftime('%b %d')}–{end_d.strftime('%b %d')}"
-    except Exception:
-        week_phrase = "next week"
-
-    days_list = [d.strip() for d in days_in.split(",") if d.strip()]
-    preferred_days_short = "/".join(days_list)
-    preferred_days_phrase = ", ".join(days_list)
-
-    return week_phrase, preferred_days_phrase, preferred_days_short
-
-def gmail_service():
-    from pathlib import Path
-    creds = None
-    token_path = Path(TOKEN_PATH)
-
-    if token_path.exists():
-        creds = Credentials.from_authorized_user_file(str(token_path), SCOPES)
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                # Token refresh failed (expired/revoked) - delete and re-authenticate
-                print(f"Token refresh failed: {e}")
-                print("Deleting expired token and starting fresh OAuth flow...")
-                if token_path.exists():
-                    token_path.unlink()
-                creds = None  # Force re-auth below
-
-        if not creds:
-            flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS, SCOPES)
-            creds = flow.run_local_server(port=0)
-
-        with open(TOKEN_PATH, "w", encoding="utf-8") as f:
-            f.write(creds.to_json())
-    return build("gmail", "v1", credentials=creds)
-
-def build_message(to_email, subject, body, cc_email=None):
-    msg = MIMEText(body, "plain", "utf-8")
-    msg["To"] = to_email
-    if cc_email:
-        msg["Cc"] = cc_email
-    msg["Subject"] = subject
-    raw = base64.urlsafe_b64encode(msg.as_bytes()).decode("utf-8")
-    return {"raw": raw}
-
-def find_case_folder(base_dir, cause_no):
-    try:
-        for name in os.listdir(base_dir):
-            full = os.path.join(base_dir, name)
-            if os.path.isdir(full) and str(cause_no) in name:
-                return full
-    except FileNotFoundError:
-        pass
-    return None
-
-def save_text_copy(folder, filename, subject, body, to_email, cc_email):
-    os.makedirs(folder, exist_ok=True)
-    out_path = os.path.join(folder, filename)
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(f"TO: {to_email}\n")
-        if cc_email:
-            f.write(f"CC: {cc_email}\n")
-        f.write(f"SUBJECT: {subject}\n\n")
-        f.write(body)
-    return out_path
+class WorkbookSession:
+    """
+    One load_workbook for any number of surgical cell writes:
+    - __enter__ loads the workbook and maps row-1 headers
+    - stamp_* methods write only the cells they target
+    - __exit__ saves once (only after a clean block that wrote something)
+    """
+    def __init__(self, workbook_path, sheet_name):
+        self.workbook_path = workbook_path
+        self.sheet_name = sheet_name
+        self.wb = None
+        self.ws = None
+        self.header_pos = {}
+        self.dirty = False
+
+    def __enter__(self):
+        # keep_vba is already False by default; keep_links stays on so saving keeps external links
+        self.wb = load_workbook(self.workbook_path, data_only=False, keep_vba=False)
+        if self.sheet_name not in self.wb.sheetnames:
+            self.wb.close()
+            raise RuntimeError(f"Sheet not found: {self.sheet_name}")
+        self.ws = self.wb[self.sheet_name]
+
+        # Map headers (row 1)
+        for c in range(1, self.ws.max_column + 1):
+            header_val = self.ws.cell(row=1, column=c).value
+            key = (str(header_val).strip() if header_val is not None else "")
+            self.header_pos[key] = c
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None and self.dirty:
+                self.wb.save(self.workbook_path)
+        finally:
+            self.wb.close()
+        return False
+
+    def ensure_column(self, name):
+        """Column index for header `name`, appending it at the end if missing."""
+        if name not in self.header_pos:
+            new_col = self.ws.max_column + 1
+            self.ws.cell(row=1, column=new_col, value=name)
+            self.header_pos[name] = new_col
+            self.dirty = True
+        return self.header_pos[name]
+
+    def stamp_emailsent(self, emailsent_col_name, causes_marked, today_str):
+        """Stamps today_str only for rows whose causeno is in causes_marked; returns rows stamped."""
+        ws = self.ws
+        # Required headers
+        if COLS["cause_no"] not in self.header_pos:
+            raise RuntimeError(f"Header '{COLS['cause_no']}' not found in row 1.")
+
+        col_cause    = self.header_pos[COLS["cause_no"]]
+
+        # Build cause_no -> row indices from one pass over the cause column
+        cause_to_rows = {}
+        causes = next(ws.iter_cols(min_col=col_cause, max_col=col_cause,
+                                   min_row=2, max_row=ws.max_row, values_only=True), ())
+        for r, v in enumerate(causes, 2):
+            key = (str(v).strip() if v is not None else "")
+            if key:
+                cause_to_rows.setdefault(key, []).append(r)
+
+        rows = [r for cause in causes_marked for r in cause_to_rows.get(str(cause).strip(), [])]
+        if not rows:
+            return 0  # nothing matched: no header added, nothing to save
+
+        # Stamp emailsent for processed causes
+        col_emailsent = self.ensure_column(emailsent_col_name)
+        for r in rows:
+            ws.cell(row=r, column=col_emailsent, value=today_str)
+        self.dirty = True
+        return len(rows)
 
 def update_emailsent_openpyxl(workbook_path, sheet_name, emailsent_col_name, causes_marked, today_str):
     """
     Surgical cell-level write:
     - Ensures 'emailsent' header exists at the end (if missing)
     - Stamps today_str only for rows whose causeno is in causes_marked
-    - Touches nothing else
+    - Touches nothing else (no load or save at all when causes_marked is empty)
     """
-    wb = load_workbook(workbook_path, data_only=False)
-    if sheet_name not in wb.sheetnames:
-        raise RuntimeError(f"Sheet not found: {sheet_name}")
-    ws = wb[sheet_name]
-
-    # Map headers (row 1)
-    header_pos = {}
-    for c in range(1, ws.max_column + 1):
-        header_val = ws.cell(row=1, column=c).value
-        key = (str(header_val).strip() if header_val is not None else "")
-        header_pos[key] = c
-
-    # Required headers
-    if COLS["cause_no"] not in header_pos:
-        raise RuntimeError(f"Header '{COLS['cause_no']}' not found in row 1.")
-
-    # Ensure emailsent column exists (append at end if missing)
-    if emailsent_col_name not in header_pos:
-        new_col = ws.max_column + 1
-        ws.cell(row=1, column=new_col, value=emailsent_col_name)
-        header_pos[emailsent_col_name] = new_col
-
-    col_cause    = header_pos[COLS["cause_no"]]
-    col_emailsent= header_pos[emailsent_col_name]
-
-    # Build cause_no -> row indices
-    cause_to_rows = {}
-    for r in range(2, ws.max_row + 1):
-        v = ws.cell(row=r, column=col_cause).value
-        key = (str(v).strip() if v is not None else "")
-        if key:
-            cause_to_rows.setdefault(key, []).append(r)
-
-    # Stamp emailsent for processed causes
-    for cause in causes_marked:
-        for r in cause_to_rows.get(str(cause).strip(), []):
-            ws.cell(row=r, column=col_emailsent, value=today_str)
-
-    wb.save(workbook_path)
+    if not causes_marked:
+        return
+    with WorkbookSession(workbook_path, sheet_name) as session:
+        session.stamp_emailsent(emailsent_col_name, causes_marked, today_str)
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--workbook", default=WORKBOOK_PATH)
     ap.add_argument("--mode", choices=["draft","send"], default=DEFAULT_MODE)
-    ap.add_argument("--limit", type=int, default=LIMIT_DEFAULT)
-    ap.add_argument("--throttle", type=float, default=THROTTLE_SEC)
+    ap.add_argument("--limit", type=int, default=LIMIT_DEFAULT, help="Stop after this many successful sends/drafts")
+    ap.add_argument("--rps", type=float, default=None, help="Gmail calls per second (default by mode)")
     ap.add_argument("--confirm-write", action="store_true",
                     help="If set, stamp 'emailsent' (YYYY-MM-DD). Otherwise READ-ONLY (no Excel writes).")
     ap.add_argument("--week", type=str, default=None,
@@ -297,10 +220,7 @@ def main():
     if EMAIL_SENT_COL not in df.columns:
         df[EMAIL_SENT_COL] = ""  # local df only; NOT writing unless --confirm-write
 
-    elig = df[
-        (df[COLS["date_submitted"]].isna() | (df[COLS["date_submitted"]].astype(str).str.strip() == "")) &
-        (df[EMAIL_SENT_COL].isna() | (df[EMAIL_SENT_COL].astype(str).str.strip() == ""))
-    ].copy()
+    elig = df[blank_mask(df[COLS["date_submitted"]]) & blank_mask(df[EMAIL_SENT_COL])].copy()
 
     if elig.empty:
         print("No eligible rows: need datesubmitted blank AND emailsent blank.")
@@ -339,7 +259,7 @@ def main():
 
     # Gmail auth
     try:
-        service = gmail_service()
+        creds = gmail_credentials(CLIENT_SECRETS, TOKEN_PATH)
     except Exception as e:
         print("Gmail auth failed:", e)
         sys.exit(1)
@@ -349,70 +269,84 @@ def main():
     sent = 0
     processed_causes = []  # causes to mark in emailsent (only if --confirm-write)
 
-    for _, row in elig.iterrows():
-        if sent >= args.limit:
-            break
-
-        cause      = str(row.get(COLS["cause_no"], "")).strip()
-        ward_first = str(row.get(COLS["ward_first"], "")).strip()
-        ward_last  = str(row.get(COLS["ward_last"], "")).strip()
-        g_name     = str(row.get(COLS["guardian_name"], "")).strip() or "Guardian"
-
-        primary_raw   = row.get(COLS["guardian_email"], "")
-        secondary_raw = row.get(COLS["guardian2_email"], "") if COLS["guardian2_email"] in df.columns else ""
-
-        g_email  = clean_email(primary_raw)
-        g2_email = clean_email(secondary_raw)
-
-        valid_primary   = is_valid_email(g_email)
-        valid_secondary = is_valid_email(g2_email)
-
-        # To / Cc selection
-        to_email, cc_email = "", None
-        if valid_primary:
-            to_email = g_email
-            if valid_secondary:
-                cc_email = g2_email
-        elif valid_secondary:
-            to_email = g2_email
-        else:
-            status = f"SKIP:no-valid-email (primary='{primary_raw}', secondary='{secondary_raw}')"
-            log_rows.append((cause, ward_last, ward_first, "", status, ""))
-            continue
-
-        subject = SUBJECT_TEMPLATE.format(WardFirst=ward_first, WardLast=ward_last)
-        body = BODY_TEMPLATE.format(
-            GuardianName=g_name,
-            WardFirst=ward_first,
-            WardLast=ward_last,
-            NextWeekPhrase=week_phrase,
-            PreferredDays=preferred_days_phrase,
-            PreferredDaysShort=preferred_days_short,
-        )
-
-        try:
-            message = build_message(to_email, subject, body, cc_email=cc_email)
-            if args.mode == "draft":
-                service.users().drafts().create(userId="me", body={"message": message}).execute()
-                status = "DRAFT"
+    # Text fields, cleaned emails and validity for every eligible row in column passes
+    text = stripped_text_frame(elig, [COLS["cause_no"], COLS["ward_first"], COLS["ward_last"], COLS["guardian_name"]])
+    text[COLS["guardian_name"]] = text[COLS["guardian_name"]].replace("", "Guardian")
+    raw = elig.reindex(columns=[COLS["guardian_email"], COLS["guardian2_email"]], fill_value="")  # as row.get(col, "")
+    emails = pd.DataFrame({
+        "g": clean_email_series(raw[COLS["guardian_email"]]),
+        "g2": clean_email_series(raw[COLS["guardian2_email"]]),
+    })
+    valid = emails.apply(lambda s: s.str.match(EMAIL_RE)).astype(bool)
+    work = pd.concat([text, raw, emails, valid.add_suffix("_ok")], axis=1)
+
+    # Build messages up to what is left of --limit and send them in batches; rows whose send
+    # failed are topped up from the next eligible rows, so --limit caps successful sends
+    render_subject = compile_template(SUBJECT_TEMPLATE)
+    render_body = compile_template(BODY_TEMPLATE)
+    limiter = RateLimiter(args.rps or GMAIL_RPS[args.mode])
+    ok_status = "DRAFT" if args.mode == "draft" else "SENT"
+    today_name = datetime.now().strftime('%Y-%m-%d')
+    folder_index = case_folder_index(NEW_CLIENTS_DIR)  # listed once per run
+
+    rows = work.itertuples(index=False, name=None)
+    while sent < args.limit:  # each round resumes the shared rows iterator
+        work_items = []  # (cause, ward_last, ward_first, to_email, cc_email, subject, body, message)
+        for (cause, ward_first, ward_last, g_name, primary_raw, secondary_raw,
+             g_email, g2_email, valid_primary, valid_secondary) in rows:
+            # To / Cc selection
+            to_email, cc_email = "", None
+            if valid_primary:
+                to_email = g_email
+                if valid_secondary:
+                    cc_email = g2_email
+            elif valid_secondary:
+                to_email = g2_email
             else:
-                service.users().messages().send(userId="me", body=message).execute()
-                status = "SENT"
+                status = f"SKIP:no-valid-email (primary='{primary_raw}', secondary='{secondary_raw}')"
+                log_rows.append((cause, ward_last, ward_first, "", status, ""))
+                continue
+
+            subject = render_subject(WardFirst=ward_first, WardLast=ward_last)
+            body = render_body(
+                GuardianName=g_name,
+                WardFirst=ward_first,
+                WardLast=ward_last,
+                NextWeekPhrase=week_phrase,
+                PreferredDays=preferred_days_phrase,
+                PreferredDaysShort=preferred_days_short,
+            )
 
-            # Save text copy
-            case_folder = find_case_folder(NEW_CLIENTS_DIR, cause) or os.path.join(GUARDIAN_BASE, "_Correspondence_Pending")
-            fname = f"Meeting Email - {ward_last}, {ward_first} - {datetime.now().strftime('%Y-%m-%d')}.txt"
-            saved_path = save_text_copy(case_folder, fname, subject, body, to_email, cc_email)
+            try:
+                message = build_message(to_email, subject, body, cc_email=cc_email)
+            except Exception as e:
+                log_rows.append((cause, ward_last, ward_first, to_email, f"ERROR:{e}", ""))
+                continue
+            work_items.append((cause, ward_last, ward_first, to_email, cc_email, subject, body, message))
+            if len(work_items) >= args.limit - sent:
+                break
+        if not work_items:
+            break
 
-            log_rows.append((cause, ward_last, ward_first, to_email, status, saved_path))
-            processed_causes.append(cause)
-            sent += 1
-            time.sleep(args.throttle)
+        messages = [(str(i), item[-1]) for i, item in enumerate(work_items)]
+        results = execute_batched(creds, args.mode, messages, limiter)
 
-        except HttpError as he:
-            log_rows.append((cause, ward_last, ward_first, to_email, f"ERROR:{he}", ""))
-        except Exception as e:
-            log_rows.append((cause, ward_last, ward_first, to_email, f"ERROR:{e}", ""))
+        for i, (cause, ward_last, ward_first, to_email, cc_email, subject, body, _) in enumerate(work_items):
+            error = results.get(str(i), RuntimeError("no response in batch"))
+            if error is not None:
+                log_rows.append((cause, ward_last, ward_first, to_email, f"ERROR:{error}", ""))
+                continue
+            try:
+                # Save text copy
+                case_folder = find_case_folder(folder_index, cause) or os.path.join(GUARDIAN_BASE, "_Correspondence_Pending")
+                fname = f"Meeting Email - {ward_last}, {ward_first} - {today_name}.txt"
+                saved_path = save_text_copy(case_folder, fname, subject, body, to_email, cc_email)
+
+                log_rows.append((cause, ward_last, ward_first, to_email, ok_status, saved_path))
+                processed_causes.append(cause)
+                sent += 1
+            except Exception as e:
+                log_rows.append((cause, ward_last, ward_first, to_email, f"ERROR:{e}", ""))
 
     # READ-ONLY by default. Only stamp emailsent if --confirm-write is provided.
     if args.confirm_write and processed_causes:
@@ -429,10 +363,10 @@ def main():
     log_dir = os.path.join(os.path.dirname(args.workbook), "runs")
     os.makedirs(log_dir, exist_ok=True)
     log_path = os.path.join(log_dir, f"meeting_email_log_{run_ts}.csv")
-    pd.DataFrame(
-        log_rows,
-        columns=["causeno","wardlast","wardfirst","to_email","status","saved_copy_path"]
-    ).to_csv(log_path, index=False, encoding="utf-8")
+    with open(log_path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["causeno","wardlast","wardfirst","to_email","status","saved_copy_path"])
+        w.writerows(log_rows)
 
     print(f"Done. {sent} item(s) processed. Log: {log_path}")
 
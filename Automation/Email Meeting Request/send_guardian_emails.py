@@ -20,19 +20,17 @@ On first run, a browser will open; your token will be saved to C:\configlocal\AP
 
 import os
 import sys
-import time
 import argparse
-from datetime import datetime, timedelta, date
-from dateutil.relativedelta import relativedelta
-import pandas as pd
-
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from email.mime.text import MIMEText
-import base64
+import csv
+from datetime import datetime, date
+
+# Shared helpers live next to the current sender in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from email_utils import (
+    EMAIL_RE, GMAIL_RPS, RateLimiter, blank_mask, build_message, case_folder_index,
+    choose_week_and_days, clean_email_series, compile_template, execute_batched, find_case_folder,
+    gmail_credentials, load_sheet1, save_text_copy, stripped_text_frame,
+)
 
 # ======= CONFIG YOU MAY EDIT =======
 WORKBOOK_PATH = r"C:\GoogleSync\Guardianship Files\data files\ward_guardian_info.xlsx"
@@ -42,7 +40,6 @@ TIMEZONE = "America/Chicago"
 
 # Run behavior
 DEFAULT_MODE = "send"     # "draft" or "send"
-THROTTLE_SEC = 2.0
 LIMIT_DEFAULT = 999999
 
 # Email templates (approved Version A)
@@ -78,122 +75,18 @@ COLS = {
     "date_submitted": "datesubmitted",
 }
 
-# Gmail API scopes + OAuth file locations
-SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
+# Gmail OAuth file locations (scopes in scripts/email_utils.py)
 CLIENT_SECRETS = r"C:\configlocal\API\gmail_oauth_client.json"  # downloaded from Cloud Console
 TOKEN_PATH     = r"C:\configlocal\API\gmail_token.json"         # created on first auth
 # ===================================
 
 
-def load_sheet1(path, sheet_name):
-    df = pd.read_excel(path, sheet_name=sheet_name, engine="openpyxl")
-    df.columns = [str(c).strip() for c in df.columns]
-    return df
-
-
-def choose_week_and_days():
-    today = date.today()
-    # Next Monday .. next Sunday by default
-    next_mon = today + relativedelta(weekday=relativedelta.MO(+1))
-    next_sun = next_mon + timedelta(days=6)
-    default_week = f"{next_mon.isoformat()}..{next_sun.isoformat()}"
-    default_days = "Wed,Thu"
-
-    print(f"\nProposed week: {default_week}  (Mon..Sun)")
-    week_in = input("Use this week? Press Enter, or enter YYYY-MM-DD..YYYY-MM-DD: ").strip()
-    if not week_in:
-        week_in = default_week
-
-    days_in = input(f"Preferred days (comma) [default {default_days}]: ").strip()
-    if not days_in:
-        days_in = default_days
-
-    # Phrase building
-    try:
-        start_s, end_s = week_in.split("..")
-        start_d = date.fromisoformat(start_s)
-        end_d = date.fromisoformat(end_s)
-        # Default wording is "next week"; if user changed week, show explicit dates
-        next_default_mon = next_mon
-        next_default_sun = next_sun
-        if (start_d != next_default_mon) or (end_d != next_default_sun):
-            week_phrase = f"the week of {start_d.strftime('%b %d')}–{end_d.strftime('%b %d')}"
-        else:
-            week_phrase = "next week"
-    except Exception:
-        week_phrase = "next week"
-
-    days_list = [d.strip() for d in days_in.split(",") if d.strip()]
-    preferred_days_short = "/".join(days_list)
-    preferred_days_phrase = ", ".join(days_list)
-
-    return week_phrase, preferred_days_phrase, preferred_days_short
-
-
-def gmail_service():
-    """
-    Loads credentials from TOKEN_PATH if present; otherwise runs OAuth using
-    CLIENT_SECRETS and saves the token to TOKEN_PATH. Returns Gmail API client.
-    """
-    creds = None
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception:
-                creds = None
-        if not creds:
-            flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS, SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open(TOKEN_PATH, "w", encoding="utf-8") as f:
-            f.write(creds.to_json())
-
-    return build("gmail", "v1", credentials=creds)
-
-
-def build_message(to_email, subject, body, cc_email=None):
-    msg = MIMEText(body, "plain", "utf-8")
-    msg["To"] = to_email
-    if cc_email:
-        msg["Cc"] = cc_email
-    msg["Subject"] = subject
-    raw = base64.urlsafe_b64encode(msg.as_bytes()).decode("utf-8")
-    return {"raw": raw}
-
-
-def find_case_folder(base_dir, cause_no):
-    """Find first folder under base_dir whose name contains the cause number."""
-    try:
-        for name in os.listdir(base_dir):
-            full = os.path.join(base_dir, name)
-            if os.path.isdir(full) and str(cause_no) in name:
-                return full
-    except FileNotFoundError:
-        pass
-    return None
-
-
-def save_text_copy(folder, filename, subject, body, to_email, cc_email):
-    os.makedirs(folder, exist_ok=True)
-    out_path = os.path.join(folder, filename)
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(f"TO: {to_email}\n")
-        if cc_email:
-            f.write(f"CC: {cc_email}\n")
-        f.write(f"SUBJECT: {subject}\n\n")
-        f.write(body)
-    return out_path
-
-
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--workbook", default=WORKBOOK_PATH)
     ap.add_argument("--mode", choices=["draft","send"], default=DEFAULT_MODE)
-    ap.add_argument("--limit", type=int, default=LIMIT_DEFAULT)
-    ap.add_argument("--throttle", type=float, default=THROTTLE_SEC)
+    ap.add_argument("--limit", type=int, default=LIMIT_DEFAULT, help="Stop after this many successful sends/drafts")
+    ap.add_argument("--rps", type=float, default=None, help="Gmail calls per second (default by mode)")
     args = ap.parse_args()
 
     # Load Sheet1 only
@@ -204,10 +97,7 @@ def main():
         print(f"ERROR: '{COLS['date_submitted']}' column not found on Sheet1.")
         sys.exit(1)
 
-    elig = df[
-        df[COLS["date_submitted"]].isna() |
-        (df[COLS["date_submitted"]].astype(str).str.strip() == "")
-    ].copy()
+    elig = df[blank_mask(df[COLS["date_submitted"]])].copy()
 
     if elig.empty:
         print("No rows with empty 'datesubmitted' found on Sheet1. Nothing to do.")
@@ -217,7 +107,7 @@ def main():
 
     # Gmail auth
     try:
-        service = gmail_service()
+        creds = gmail_credentials(CLIENT_SECRETS, TOKEN_PATH)
     except Exception as e:
         print("Gmail auth failed:", e)
         sys.exit(1)
@@ -225,102 +115,107 @@ def main():
     run_ts = datetime.now().strftime("%Y-%m-%d_%H%M%S")
     log_rows = []
     sent = 0
+    processed_causes = []  # stamped into datesubmitted after the loop
+    today_str = date.today().strftime("%Y-%m-%d")  # copy names and the datesubmitted stamp
+
+    # All per-row text in column passes; a missing g2 column reads as ""
+    work = stripped_text_frame(elig, [COLS["cause_no"], COLS["ward_first"], COLS["ward_last"], COLS["guardian_name"]])
+    work[COLS["guardian_name"]] = work[COLS["guardian_name"]].replace("", "Guardian")
+    emails = elig.reindex(columns=[COLS["guardian_email"], COLS["guardian2_email"]]).apply(clean_email_series)
+    valid = emails.apply(lambda s: s.str.match(EMAIL_RE)).astype(bool)
+    # Cc only a valid second address
+    emails[COLS["guardian2_email"]] = emails[COLS["guardian2_email"]].where(valid[COLS["guardian2_email"]], "")
+
+    # Build messages up to what is left of --limit and send them in batches; rows whose send
+    # failed are topped up from the next eligible rows, so --limit caps successful sends
+    render_subject = compile_template(SUBJECT_TEMPLATE)
+    render_body = compile_template(BODY_TEMPLATE)
+    limiter = RateLimiter(args.rps or GMAIL_RPS[args.mode])
+    ok_status = "DRAFT" if args.mode == "draft" else "SENT"
+    folder_index = case_folder_index(GUARDIAN_BASE)  # listed once per run
+
+    rows = zip(work.itertuples(index=False, name=None), emails.itertuples(index=False, name=None), valid[COLS["guardian_email"]])
+    while sent < args.limit:  # each round resumes the shared rows iterator
+        work_items = []  # (cause, ward_last, ward_first, g_email, g2_email, subject, body, message)
+        for (cause, ward_first, ward_last, g_name), (g_email, g2_email), ok in rows:
+            if not ok:
+                status = "SKIP:no-primary-email"
+                log_rows.append((cause, ward_last, ward_first, g_email, status, ""))
+                continue
+
+            subject = render_subject(WardFirst=ward_first, WardLast=ward_last)
+            body = render_body(
+                GuardianName=g_name,
+                WardFirst=ward_first,
+                WardLast=ward_last,
+                NextWeekPhrase=week_phrase,
+                PreferredDays=preferred_days,
+                PreferredDaysShort=preferred_days_short,
+            )
 
-    for _, row in elig.iterrows():
-        if sent >= args.limit:
+            try:
+                message = build_message(g_email, subject, body, cc_email=g2_email if g2_email else None)
+            except Exception as e:
+                log_rows.append((cause, ward_last, ward_first, g_email, f"ERROR:{e}", ""))
+                continue
+            work_items.append((cause, ward_last, ward_first, g_email, g2_email, subject, body, message))
+            if len(work_items) >= args.limit - sent:
+                break
+        if not work_items:
             break
 
-        cause = str(row.get(COLS["cause_no"], "")).strip()
-        ward_first = str(row.get(COLS["ward_first"], "")).strip()
-        ward_last  = str(row.get(COLS["ward_last"], "")).strip()
-        g_name     = str(row.get(COLS["guardian_name"], "")).strip() or "Guardian"
-        g_email    = str(row.get(COLS["guardian_email"], "")).strip()
-        g2_email   = ""
-        if COLS["guardian2_email"] in df.columns:
-            g2_email = str(row.get(COLS["guardian2_email"], "")).strip()
-
-        if not g_email or g_email.lower() in ("nan", "none"):
-            status = "SKIP:no-primary-email"
-            log_rows.append((cause, ward_last, ward_first, g_email, status, ""))
-            continue
-
-        subject = SUBJECT_TEMPLATE.format(WardFirst=ward_first, WardLast=ward_last)
-        body = BODY_TEMPLATE.format(
-            GuardianName=g_name,
-            WardFirst=ward_first,
-            WardLast=ward_last,
-            NextWeekPhrase=week_phrase,
-            PreferredDays=preferred_days,
-            PreferredDaysShort=preferred_days_short,
-        )
-
-        try:
-            message = build_message(g_email, subject, body, cc_email=g2_email if g2_email else None)
-            if args.mode == "draft":
-                service.users().drafts().create(userId="me", body={"message": message}).execute()
-                status = "DRAFT"
-            else:
-                service.users().messages().send(userId="me", body=message).execute()
-                status = "SENT"
-
-            # Save text copy
-            case_folder = find_case_folder(GUARDIAN_BASE, cause) or os.path.join(GUARDIAN_BASE, "_Unmatched Emails")
-            fname = f"Meeting Email - {ward_last}, {ward_first} - {datetime.now().strftime('%Y-%m-%d')}.txt"
-            saved_path = save_text_copy(case_folder, fname, subject, body, g_email, g2_email if g2_email else None)
-
-            # Update datesubmitted in Sheet1 (only)
-            df.loc[
-                df[COLS["cause_no"]].astype(str).str.strip() == cause,
-                COLS["date_submitted"]
-            ] = date.today().strftime("%Y-%m-%d")
-
-            log_rows.append((cause, ward_last, ward_first, g_email, status, saved_path))
-            sent += 1
-            time.sleep(args.throttle)
-
-        except HttpError as he:
-            log_rows.append((cause, ward_last, ward_first, g_email, f"ERROR:{he}", ""))
-        except Exception as e:
-            log_rows.append((cause, ward_last, ward_first, g_email, f"ERROR:{e}", ""))
-
-    # Write back updates using openpyxl to preserve formatting
+        messages = [(str(i), item[-1]) for i, item in enumerate(work_items)]
+        results = execute_batched(creds, args.mode, messages, limiter)
+
+        for i, (cause, ward_last, ward_first, g_email, g2_email, subject, body, _) in enumerate(work_items):
+            error = results.get(str(i), RuntimeError("no response in batch"))
+            if error is not None:
+                log_rows.append((cause, ward_last, ward_first, g_email, f"ERROR:{error}", ""))
+                continue
+            try:
+                # Save text copy
+                case_folder = find_case_folder(folder_index, cause) or os.path.join(GUARDIAN_BASE, "_Unmatched Emails")
+                fname = f"Meeting Email - {ward_last}, {ward_first} - {today_str}.txt"
+                saved_path = save_text_copy(case_folder, fname, subject, body, g_email, g2_email if g2_email else None)
+
+                log_rows.append((cause, ward_last, ward_first, g_email, ok_status, saved_path))
+                processed_causes.append(cause)
+                sent += 1
+            except Exception as e:
+                log_rows.append((cause, ward_last, ward_first, g_email, f"ERROR:{e}", ""))
+
+    # Write back updates using openpyxl to preserve formatting (only the causes we processed)
     try:
-        from openpyxl import load_workbook
-
-        wb = load_workbook(args.workbook)
-        ws = wb[SHEET1_NAME]
-
-        # Find the causeno and datesubmitted column indices
-        causeno_col = None
-        datesubmitted_col = None
-
-        for col_idx, cell in enumerate(ws[1], 1):
-            if cell.value == COLS["cause_no"]:
-                causeno_col = col_idx
-            elif cell.value == COLS["date_submitted"]:
-                datesubmitted_col = col_idx
-
-        if causeno_col and datesubmitted_col:
-            # Update datesubmitted for processed cases
-            for _, row in df.iterrows():
-                cause = str(row.get(COLS["cause_no"], "")).strip()
-                date_val = row.get(COLS["date_submitted"])
-
-                # Only update if we changed it (not NaN)
-                if pd.notna(date_val):
-                    # Find matching row in Excel
-                    for row_idx in range(2, ws.max_row + 1):
-                        cell_value = str(ws.cell(row_idx, causeno_col).value or "").strip()
-                        if cell_value == cause:
-                            ws.cell(row_idx, datesubmitted_col, date_val)
-                            break
-
-            # Save with preserved formatting
-            wb.save(args.workbook)
-            wb.close()
-        else:
-            print("WARNING: Could not find causeno or datesubmitted columns")
-            wb.close()
+        if processed_causes:
+            from openpyxl import load_workbook
+
+            wb = load_workbook(args.workbook)
+            ws = wb[SHEET1_NAME]
+
+            # Find the causeno and datesubmitted column indices
+            header_pos = {cell.value: col_idx for col_idx, cell in enumerate(ws[1], 1)}
+            causeno_col = header_pos.get(COLS["cause_no"])
+            datesubmitted_col = header_pos.get(COLS["date_submitted"])
+
+            if causeno_col and datesubmitted_col:
+                # causeno -> Excel rows, one pass over the column
+                cause_to_rows = {}
+                for row_idx, (v,) in enumerate(ws.iter_rows(min_row=2, min_col=causeno_col, max_col=causeno_col,
+                                                            values_only=True), 2):
+                    key = str(v or "").strip()
+                    if key:
+                        cause_to_rows.setdefault(key, []).append(row_idx)
+
+                for cause in processed_causes:
+                    for row_idx in cause_to_rows.get(cause, []):
+                        ws.cell(row_idx, datesubmitted_col, today_str)
+
+                # Save with preserved formatting
+                wb.save(args.workbook)
+                wb.close()
+            else:
+                print("WARNING: Could not find causeno or datesubmitted columns")
+                wb.close()
 
     except Exception as e:
         print("WARNING: Could not write back to workbook:", e)
@@ -329,9 +224,10 @@ def main():
     log_dir = os.path.join(os.path.dirname(args.workbook), "runs")
     os.makedirs(log_dir, exist_ok=True)
     log_path = os.path.join(log_dir, f"meeting_email_log_{run_ts}.csv")
-    pd.DataFrame(log_rows, columns=["causeno","wardlast","wardfirst","to_email","status","saved_copy_path"]).to_csv(
-        log_path, index=False, encoding="utf-8"
-    )
+    with open(log_path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["causeno","wardlast","wardfirst","to_email","status","saved_copy_path"])
+        w.writerows(log_rows)
 
     print(f"Done. {sent} item(s) processed. Log: {log_path}")
 
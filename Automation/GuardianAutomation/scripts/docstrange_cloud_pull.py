@@ -8,15 +8,22 @@ DocStrange → hardened ARP/Order extractor
 """
 
 from __future__ import annotations
-import os, re, json, csv, sys, time
+import os, re, csv, sys, time, threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 
+from docstrange_utils import cache_key, cache_load, cache_store, json_text
+
 # ---------- CONFIG ----------
 INPUT_DIR  = r"C:\GoogleSync\Guardianship Files\aa New"
 OUT_DIR    = r"C:\GoogleSync\Guardianship Files\Extracted"
 CSV_PATH   = Path(OUT_DIR) / "ward_guardian_info_out.csv"
 
+# PDFs in flight against the DocStrange cloud at once (the calls are network-bound)
+CLOUD_WORKERS = 4
+
 # Only process these page numbers (1-indexed)
 ARP_PAGES   = [1, 2]
 ORDER_PAGES = [1]
@@ -75,6 +82,17 @@ def _init_docstrange_cloud():
     # (DocStrange 1.1.x: api_key presence → cloud; cpu flag only affects local OCR path)
     return DocumentExtractor(api_key=api_key), api_key
 
+# One extractor per worker thread (client state is not shared across threads)
+_thread_local = threading.local()
+
+def _thread_extractor(api_key: str):
+    extractor = getattr(_thread_local, "extractor", None)
+    if extractor is None:
+        from docstrange import DocumentExtractor
+        extractor = DocumentExtractor(api_key=api_key)
+        _thread_local.extractor = extractor
+    return extractor
+
 def _extract_cloud_fields(extractor, file_path: str, fields: List[str]) -> Tuple[Dict[str, Any], Optional[str]]:
     """
     Try cloud structured extraction. Returns (data, raw_payload or None).
@@ -96,33 +114,43 @@ def _extract_cloud_fields(extractor, file_path: str, fields: List[str]) -> Tuple
 
 # ---------- FALLBACK PARSERS (text-based) ----------
 _re_space = re.compile(r"\s+")
+_re_case_no = re.compile(r"No\.\s*C-1-PB-?\s*([0-9]{2}-[0-9]{6})", re.I)
+_re_filed = re.compile(r"(FILED\s+FOR\s+RECORD|FILED:|Filed on:)\s*([0-9/.\-]{6,12})", re.I)
+_re_signed = re.compile(r"Signed\s+on:\s*([A-Za-z]+\s+\d{1,2},\s*\d{4}|[0-9/.\-]{6,12})", re.I)
 
 def _norm(s: Optional[str]) -> str:
     return _re_space.sub(" ", s.strip()) if isinstance(s, str) else ""
 
 def _find_case_number(txt: str) -> Optional[str]:
     # Examples: "No. C-1-PB-19-000694" → want "19-000694"
-    m = re.search(r"No\.\s*C-1-PB-?\s*([0-9]{2}-[0-9]{6})", txt, re.I)
+    m = _re_case_no.search(txt)
     return m.group(1) if m else None
 
 def _find_filed_date(txt: str) -> Optional[str]:
     # Look for "FILED FOR RECORD" / "FILED:" / "Filed on:" not "Updated"
-    m = re.search(r"(FILED\s+FOR\s+RECORD|FILED:|Filed on:)\s*([0-9/.\-]{6,12})", txt, re.I)
+    m = _re_filed.search(txt)
     return m.group(2) if m else None
 
 def _find_signed_on(txt: str) -> Optional[str]:
-    m = re.search(r"Signed\s+on:\s*([A-Za-z]+\s+\d{1,2},\s*\d{4}|[0-9/.\-]{6,12})", txt, re.I)
+    m = _re_signed.search(txt)
     return m.group(1) if m else None
 
+@lru_cache(maxsize=None)
+def _label_res(label: str) -> Tuple[re.Pattern, re.Pattern]:
+    # ("LABEL: value", "LABEL\nvalue") patterns, compiled once per label
+    lab = re.escape(label)
+    return (re.compile(lab + r"\s*[:\-]\s*(.+)", re.I),
+            re.compile(lab + r"\s*[:\-]?\s*\n([^\n]+)", re.I))
+
 def _find_labeled_value(txt: str, label: str, take_next_line: bool=False) -> Optional[str]:
+    same_line, next_line = _label_res(label)
     # Generic: try "LABEL: value"
-    pat = re.compile(re.escape(label) + r"\s*[:\-]\s*(.+)", re.I)
-    m = pat.search(txt)
+    m = same_line.search(txt)
     if m:
         return _norm(m.group(1))
     if take_next_line:
         # Try the next line after the label if value sits under
-        m2 = re.search(re.escape(label) + r"\s*[:\-]?\s*\n([^\n]+)", txt, re.I)
+        m2 = next_line.search(txt)
         if m2:
             return _norm(m2.group(1))
     return None
@@ -246,56 +274,86 @@ def _row_from_order(fields: Dict[str, Any], text_fallback: Optional[str]) -> Dic
     return row
 
 # ---------- MAIN ----------
+def _process_pdf(api_key: str, pdf: Path, kind: str) -> Tuple[Optional[Dict[str,str]], Path, Optional[str]]:
+    """Cloud call + JSON dumps + row build for one PDF (runs on a worker thread).
+    Returns (row or None, out_json, error)."""
+    fields = FIELDS_ARP if kind == "ARP" else FIELDS_ORDER
+
+    key = cache_key(pdf, fields)
+    cached = cache_load(OUT_DIR, key)
+    if cached is not None:
+        print(f"♻️  Cached: {pdf.name} [{kind}]")
+        data, raw_text = cached["data"], cached["raw_text"]
+    else:
+        print(f"☁️  Cloud extracting: {pdf.name} [{kind}]")
+        # Cloud call
+        data, raw_text = _extract_cloud_fields(_thread_extractor(api_key), str(pdf), fields)
+        if not (isinstance(data, dict) and data.get("_format") == "json_parse_error"):
+            cache_store(OUT_DIR, key, {"data": data, "raw_text": raw_text})
+
+    # Persist what came back for inspection
+    out_json = Path(OUT_DIR) / f"{pdf.stem}.cloud.fields.json"
+    out_json.write_text(json_text(data), encoding="utf-8")
+    if raw_text:
+        Path(OUT_DIR, f"{pdf.stem}.raw.txt").write_text(
+            raw_text if isinstance(raw_text,str) else json_text(raw_text),
+            encoding="utf-8"
+        )
+
+    # Build CSV row with fallbacks
+    try:
+        if kind == "ARP":
+            row = _row_from_arp(data if isinstance(data, dict) else {}, raw_text)
+        else:
+            row = _row_from_order(data if isinstance(data, dict) else {}, raw_text)
+        return row, out_json, None
+    except Exception as e:
+        return None, out_json, str(e)
+
 def main():
     _ensure_dirs()
-    extractor, api_key = _init_docstrange_cloud()
+    _, api_key = _init_docstrange_cloud()  # fails fast on a missing key or package
     print("▶ Using DocStrange CLOUD with specified fields + fallbacks")
 
+    # One directory listing (no per-file stat on the synced folder); classify by name
+    try:
+        with os.scandir(INPUT_DIR) as it:
+            entries = sorted((e for e in it if e.name.lower().endswith(".pdf") and e.is_file()),
+                             key=lambda e: e.name.lower())
+    except FileNotFoundError:
+        print(f"✗ Input folder not found: {INPUT_DIR}")
+        entries = []
+
+    queued = []
+    for e in entries:
+        stem = e.name[:-4].lower()
+
+        if "approval" in stem:
+            print(f"⏭️  Skipping {e.name} (approval)")
+            continue
+
+        kind = "ARP" if "arp" in stem else "Order" if "order" in stem else "Other"
+        if kind == "Other":
+            print(f"⏭️  Skipping {e.name} (not ARP/Order)")
+            continue
+        queued.append((Path(e.path), kind))
+
     # Prepare CSV (create if not exists)
     is_new = not CSV_PATH.exists()
-    with open(CSV_PATH, "a", newline="", encoding="utf-8") as fcsv:
+    with open(CSV_PATH, "a", newline="", encoding="utf-8") as fcsv, \
+            ThreadPoolExecutor(max_workers=CLOUD_WORKERS) as ex:
         w = csv.DictWriter(fcsv, fieldnames=CSV_HEADERS)
         if is_new:
             w.writeheader()
 
-        for pdf in sorted(Path(INPUT_DIR).glob("*.pdf")):
-            stem = pdf.stem.lower()
-
-            if "approval" in stem:
-                print(f"⏭️  Skipping {pdf.name} (approval)")
+        # Cloud calls overlap; rows are written here, in file order
+        results = ex.map(lambda job: _process_pdf(api_key, *job), queued)
+        for (pdf, _), (row, out_json, error) in zip(queued, results):
+            if error is not None:
+                print(f"   ✗ Error building row for {pdf.name}: {error}")
                 continue
-
-            kind = "ARP" if "arp" in stem else "Order" if "order" in stem else "Other"
-            if kind == "Other":
-                print(f"⏭️  Skipping {pdf.name} (not ARP/Order)")
-                continue
-
-            print(f"☁️  Cloud extracting: {pdf.name} [{kind}]")
-            fields = FIELDS_ARP if kind == "ARP" else FIELDS_ORDER
-
-            # Cloud call
-            data, raw_text = _extract_cloud_fields(extractor, str(pdf), fields)
-
-            # Persist what came back for inspection
-            out_json = Path(OUT_DIR) / f"{pdf.stem}.cloud.fields.json"
-            with open(out_json, "w", encoding="utf-8") as jf:
-                json.dump(data, jf, ensure_ascii=False, indent=2)
-            if raw_text:
-                Path(OUT_DIR, f"{pdf.stem}.raw.txt").write_text(
-                    raw_text if isinstance(raw_text,str) else json.dumps(raw_text, ensure_ascii=False, indent=2),
-                    encoding="utf-8"
-                )
-
-            # Build CSV row with fallbacks
-            try:
-                if kind == "ARP":
-                    row = _row_from_arp(data if isinstance(data, dict) else {}, raw_text)
-                else:
-                    row = _row_from_order(data if isinstance(data, dict) else {}, raw_text)
-                w.writerow(row)
-                print(f"   ✅ wrote {out_json.name} and appended to {CSV_PATH.name}")
-            except Exception as e:
-                print(f"   ✗ Error building row for {pdf.name}: {e}")
+            w.writerow(row)
+            print(f"   ✅ wrote {out_json.name} and appended to {CSV_PATH.name}")
 
 if __name__ == "__main__":
     main()
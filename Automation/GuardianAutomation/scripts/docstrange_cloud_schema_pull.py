@@ -10,14 +10,20 @@ DocStrange cloud extractor -> spreadsheet-shaped CSV for ARP + Order.
 - Writes one CSV with the exact columns in 'ward_guardian_info2test.xlsx'
 """
 
-import os, re, json, csv, sys, datetime
+import os, re, csv, sys, datetime, threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from docstrange_utils import cache_key, cache_load, cache_store, json_text
+
 # ---------- YOUR FOLDERS ----------
 INPUT_DIR = r"C:\GoogleSync\Guardianship Files\aa New"
 OUT_DIR   = r"C:\GoogleSync\Guardianship Files\Extracted"
 CSV_PATH  = Path(OUT_DIR) / "ward_guardian_info_out.csv"
 
+# PDFs in flight against the DocStrange cloud at once (the calls are network-bound)
+CLOUD_WORKERS = 4
+
 # ---------- ENV KEY LOADER ----------
 def load_api_key() -> str:
     # Prefer file path env (what you already use)
@@ -122,27 +128,36 @@ def split_name(full: str):
 
 def normalize_phone(s: str) -> str:
     if not s: return ""
-    digits = re.sub(r"\D+", "", s)
+    digits = "".join(filter(str.isdecimal, s))  # isdecimal == regex \d for str
     if len(digits) == 10:
         return f"({digits[0:3]}) {digits[3:6]}-{digits[6:]}"
     if len(digits) == 7:
         return f"{digits[0:3]}-{digits[3:]}"
     return s.strip()
 
-def text_from_pdf_first_pages(pdf_path: Path, max_pages=2) -> str:
+HEADER_BAND = 0.2  # top fraction of a page holding the case number and FILED stamp
+
+def text_from_pdf_first_pages(pdf_path: Path, max_pages=2, header_only=False) -> str:
     if not fitz:
         return ""
     try:
         with fitz.open(str(pdf_path)) as doc:
             pages = min(max_pages, len(doc))
-            return "\n".join(doc[i].get_text() for i in range(pages))
+            if not header_only:
+                return "\n".join(doc[i].get_text() for i in range(pages))
+            texts = []
+            for i in range(pages):
+                r = doc[i].rect
+                texts.append(doc[i].get_text("text", clip=fitz.Rect(r.x0, r.y0, r.x1, r.y0 + r.height * HEADER_BAND)))
+            return "\n".join(texts)
     except Exception:
         return ""
 
-CASE_RE = re.compile(r"(C-1-PB-\s*\d{2}\s*-\s*\d{6})")
-STAMP_RE = re.compile(
-    r"(FILED\s+FOR\s+RECORD|Filed\s*:|Filed\s+on\s*:)\s*([A-Z][a-z]{2,}\s+\d{1,2},?\s+\d{2,4}|\d{1,2}/\d{1,2}/\d{2,4}|[A-Z]{3}\s+\d{1,2}\s+\d{2,4})",
-    re.IGNORECASE
+# Case number OR filed stamp, so the fallback walks the text once (stamp part case-insensitive)
+CASE_OR_STAMP_RE = re.compile(
+    r"(?P<case>C-1-PB-\s*\d{2}\s*-\s*\d{6})"
+    r"|(?i:(?:FILED\s+FOR\s+RECORD|Filed\s*:|Filed\s+on\s*:)\s*"
+    r"(?P<stamp>[A-Z][a-z]{2,}\s+\d{1,2},?\s+\d{2,4}|\d{1,2}/\d{1,2}/\d{2,4}|[A-Z]{3}\s+\d{1,2}\s+\d{2,4}))"
 )
 
 def derive_liveswith(d: dict) -> str:
@@ -219,30 +234,59 @@ def to_row(d: dict, pdf_name: str, is_order: bool) -> dict:
 
     return row
 
-def ensure_csv_header():
-    CSV_PATH.parent.mkdir(parents=True, exist_ok=True)
-    if not CSV_PATH.exists():
-        with open(CSV_PATH, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=SHEET_COLUMNS)
-            w.writeheader()
-
-def append_row(row: dict):
-    with open(CSV_PATH, "a", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=SHEET_COLUMNS)
-        w.writerow(row)
-
 def fallback_enrich_from_pdftext(pdf_path: Path, row: dict, is_order: bool):
-    txt = text_from_pdf_first_pages(pdf_path, max_pages=1 if is_order else 2)
-    if not txt:
+    need_case, need_stamp = not row.get("causeno"), not row.get("DateARPfiled")
+    if not (need_case or need_stamp):
         return
-    if not row.get("causeno"):
-        m = CASE_RE.search(txt)
-        if m:
-            row["causeno"] = m.group(1).replace(" ", "")
-    if not row.get("DateARPfiled"):
-        m = STAMP_RE.search(txt)
-        if m:
-            row["DateARPfiled"] = m.group(2)
+    # Header band first; whole pages only if something is still missing
+    for header_only in (True, False):
+        txt = text_from_pdf_first_pages(pdf_path, max_pages=1 if is_order else 2, header_only=header_only)
+        # First case number and first stamp in one pass; stop once nothing is missing
+        for m in CASE_OR_STAMP_RE.finditer(txt):
+            if m.group("case") is not None:
+                if need_case:
+                    row["causeno"] = m.group("case").replace(" ", "")
+                    need_case = False
+            elif need_stamp:
+                row["DateARPfiled"] = m.group("stamp")
+                need_stamp = False
+            if not (need_case or need_stamp):
+                return
+
+# One extractor per worker thread (client state is not shared across threads)
+_thread_local = threading.local()
+
+def thread_extractor(api_key: str):
+    extractor = getattr(_thread_local, "extractor", None)
+    if extractor is None:
+        extractor = DocumentExtractor(api_key=api_key)  # CLOUD
+        _thread_local.extractor = extractor
+    return extractor
+
+def process_pdf(api_key: str, pdf: Path, out: Path, is_order: bool):
+    """Cloud extract + fields JSON + row for one PDF (runs on a worker thread).
+    Returns (row, fields_path); raises on failure."""
+    doc_type = "Order" if is_order else "ARP"
+    key = cache_key(pdf, JSON_SCHEMA)
+    data = cache_load(OUT_DIR, key)
+    if data is not None:
+        print(f"♻️  Cached: {pdf.name} [{doc_type}]")
+    else:
+        print(f"☁️  Cloud extracting: {pdf.name} [{doc_type}]")
+        result = thread_extractor(api_key).extract(str(pdf))
+        data = result.extract_data(json_schema=JSON_SCHEMA)  # <- JSON schema mode
+        cache_store(OUT_DIR, key, data)
+    # Save raw structured fields (for troubleshooting)
+    fields_path = out / f"{pdf.stem}.cloud.fields.json"
+    fields_path.write_text(json_text(data), encoding="utf-8")
+
+    # Flatten the actual values dict
+    extracted = data.get("structured_data") or data.get("extracted_fields") or data
+
+    row = to_row(extracted, pdf.name, is_order=is_order)
+    # PDF-text fallbacks for case # and filed date
+    fallback_enrich_from_pdftext(pdf, row, is_order=is_order)
+    return row, fields_path
 
 def main():
     api_key = load_api_key()
@@ -250,47 +294,52 @@ def main():
         print("No API key. Set DOCSTRANGE_API_KEY or DOCSTRANGE_API_KEY_FILE.")
         sys.exit(2)
 
-    extractor = DocumentExtractor(api_key=api_key)  # CLOUD
     inp = Path(INPUT_DIR)
     out = Path(OUT_DIR)
     out.mkdir(parents=True, exist_ok=True)
 
-    ensure_csv_header()
-
-    pdfs = sorted([p for p in inp.glob("*.pdf") if p.is_file()])
+    # One directory listing (no per-file stat on the synced folder); classify by name
+    try:
+        with os.scandir(inp) as it:
+            pdfs = sorted((e for e in it if e.name.lower().endswith(".pdf") and e.is_file()),
+                          key=lambda e: e.name.lower())
+    except FileNotFoundError:
+        pdfs = []
     if not pdfs:
         print(f"No PDFs in {inp}")
         return
 
-    for pdf in pdfs:
-        stem_lower = pdf.stem.lower()
+    queued = []
+    for e in pdfs:
+        stem_lower = e.name[:-4].lower()
         if "approval" in stem_lower:
-            print(f"⏭️  Skipping {pdf.name} (approval)")
+            print(f"⏭️  Skipping {e.name} (approval)")
             continue
+        queued.append((Path(e.path), "order" in stem_lower))
 
-        is_order = "order" in stem_lower
-        doc_type = "Order" if is_order else "ARP"
-        print(f"☁️  Cloud extracting: {pdf.name} [{doc_type}]")
-
+    def run(job):
+        pdf, is_order = job
         try:
-            result = extractor.extract(str(pdf))
-            data = result.extract_data(json_schema=JSON_SCHEMA)  # <- JSON schema mode
-            # Save raw structured fields (for troubleshooting)
-            fields_path = out / f"{pdf.stem}.cloud.fields.json"
-            fields_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-            # Flatten the actual values dict
-            extracted = data.get("structured_data") or data.get("extracted_fields") or data
-
-            row = to_row(extracted, pdf.name, is_order=is_order)
-            # PDF-text fallbacks for case # and filed date
-            fallback_enrich_from_pdftext(pdf, row, is_order=is_order)
+            return process_pdf(api_key, pdf, out, is_order), None
+        except Exception as e:
+            return None, e
+
+    # One CSV handle for the run (create with header if missing); 1 MiB buffer, flushed on close
+    is_new = not CSV_PATH.exists()
+    with open(CSV_PATH, "a", newline="", encoding="utf-8", buffering=1 << 20) as fcsv, \
+            ThreadPoolExecutor(max_workers=CLOUD_WORKERS) as ex:
+        w = csv.DictWriter(fcsv, fieldnames=SHEET_COLUMNS)
+        if is_new:
+            w.writeheader()
 
-            append_row(row)
+        # Cloud calls overlap; rows are appended here, in file order
+        for (pdf, _), (done, error) in zip(queued, ex.map(run, queued)):
+            if error is not None:
+                print(f"   ✗ Error on {pdf.name}: {error}")
+                continue
+            row, fields_path = done
+            w.writerow(row)
             print(f"   ✅ wrote {fields_path.name} and appended to {CSV_PATH.name}")
 
-        except Exception as e:
-            print(f"   ✗ Error on {pdf.name}: {e}")
-
 if __name__ == "__main__":
     main()
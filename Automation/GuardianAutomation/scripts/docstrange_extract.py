@@ -1,20 +1,30 @@
 # CPU-only high-quality extraction for ARP (pages 1–2) and ORDER (page 1).
-# Renders target pages to PNG at 300 DPI, extracts structured fields with DocStrange (local/Ollama),
+# Renders target pages to grayscale PNG at 200 DPI (300 DPI retry for thin pages), extracts structured fields with DocStrange (local/Ollama),
 # writes per-page fields (with metadata) and a merged per-document fields JSON (plain key→value dict).
 #
 # Usage:
 #   py -3.12 "C:\GoogleSync\Automation\GuardianAutomation\scripts\docstrange_quick_pages.py"
 
+import os
 import json
+import tempfile
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 import fitz  # PyMuPDF
-from docstrange import DocumentExtractor
+# docstrange is imported in main(): render workers re-import this module and only need fitz
+if TYPE_CHECKING:
+    from docstrange import DocumentExtractor
 
 # --- Paths & settings ---
 INPUT_DIR  = Path(r"C:\GoogleSync\Guardianship Files\aa New")
 OUTPUT_DIR = Path(r"C:\GoogleSync\Guardianship Files\Extracted")
-DPI        = 300  # 300 DPI = better OCR; slower on CPU but higher accuracy
+DPI        = 200  # black text on white: 200 DPI grayscale is enough for OCR and ~6x fewer pixels than 300 DPI RGB
+HIGH_DPI   = 300
+HIGH_DPI_FALLBACK = True  # re-render a page at HIGH_DPI and retry when most of its fields come back empty
+RENDER_WORKERS = min(4, os.cpu_count() or 1)  # processes rasterizing pages ahead of extraction
+KEEP_PNGS  = False  # True = also keep page PNGs in OUTPUT_DIR; otherwise they live in %TEMP% (off the synced folder)
 
 # Silence the harmless "pin_memory ... no accelerator" warning
 warnings.filterwarnings("ignore", message=".*pin_memory.*", category=UserWarning)
@@ -46,74 +56,91 @@ FIELDS_P2 = [
 # For ORDER (page 1 only) we re-use page-1 identity fields
 FIELDS_ORDER = FIELDS_P1[:]
 
+EMPTY = (None, "", [], {})  # extracted values that count as "not found"
+
 # ========================================================================
 
 def render_pages_to_png(pdf_path: Path, out_dir: Path, dpi: int, page_indices: list[int]) -> list[Path]:
-    """Render selected 0-based pages to PNG; return list of PNG file paths."""
+    """Render selected 0-based pages to grayscale PNG; return list of PNG file paths."""
     out_dir.mkdir(parents=True, exist_ok=True)
     pngs: list[Path] = []
+    mat = fitz.Matrix(dpi / 72, dpi / 72)
     with fitz.open(pdf_path) as doc:
         for i in page_indices:
             if i < 0 or i >= len(doc):
                 continue
-            mat = fitz.Matrix(dpi / 72, dpi / 72)
-            pix = doc.load_page(i).get_pixmap(matrix=mat, alpha=False)
+            # Interpret the page content once into a display list, rasterize from that
+            dl = doc.load_page(i).get_displaylist()
+            pix = dl.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
             out_png = out_dir / f"{pdf_path.stem}_p{i+1}.png"
             pix.save(out_png)
             pngs.append(out_png)
     return pngs
 
-def extract_fields_from_image(extractor: DocumentExtractor, png_path: Path, requested_fields: list[str]) -> dict:
+def extract_fields_from_image(extractor: "DocumentExtractor", png_path: Path, requested_fields: list[str]) -> dict:
     """
     Return the full DocStrange result dict for this image (contains 'extracted_fields', 'requested_fields', etc.).
     """
     res = extractor.extract(str(png_path))
     return res.extract_data(specified_fields=requested_fields)
 
+def filled_count(result: dict, requested_fields: list[str]) -> int:
+    """How many of the requested fields came back non-empty."""
+    ef = result.get("extracted_fields", {}) if isinstance(result, dict) else {}
+    return sum((ef or {}).get(f) not in EMPTY for f in requested_fields)
+
 def non_empty_merge(pages: list[dict]) -> dict:
     """
     Merge the INNER 'extracted_fields' dicts from page results.
     Rule: Only write non-empty values; never let empty overwrite something good.
     Return a PLAIN dict of merged fields (no wrapper), ideal for feeding your Excel step.
     """
-    EMPTY = (None, "", [], {})
     merged: dict = {}
     for page in pages:
         ef = page.get("extracted_fields", {}) if isinstance(page, dict) else {}
         for k, v in (ef or {}).items():
-            if v not in EMPTY:
+            # Truthy values can't equal an EMPTY sentinel; only falsy ones pay for the tuple scan
+            if v or v not in EMPTY:
                 merged[k] = v  # last non-empty wins
     return merged
 
-def process_pdf(extractor: DocumentExtractor, pdf: Path):
+def page_plan_for(pdf: Path):
+    """[(0-based page, fields)] for an ARP/ORDER PDF; None (with a skip note) otherwise."""
     name = pdf.stem.lower()
 
     # Skip approvals entirely
     if "approval" in name:
         print(f"⏭️  Skipping {pdf.name} (approval)")
-        return
+        return None
 
     # Target pages and fields per doc type
     if "arp" in name:
-        page_plan = [(0, FIELDS_P1), (1, FIELDS_P2)]  # pages 1–2
-    elif "order" in name:
-        page_plan = [(0, FIELDS_ORDER)]               # page 1
-    else:
-        print(f"⏭️  Skipping {pdf.name} (not ARP/ORDER)")
-        return
-
-    all_page_results: list[dict] = []
-    print(f"🖼️  Rendering {pdf.name} at {DPI} DPI …")
-    pngs = render_pages_to_png(pdf, OUTPUT_DIR, DPI, [p for p, _ in page_plan])
+        return [(0, FIELDS_P1), (1, FIELDS_P2)]  # pages 1–2
+    if "order" in name:
+        return [(0, FIELDS_ORDER)]               # page 1
+    print(f"⏭️  Skipping {pdf.name} (not ARP/ORDER)")
+    return None
+
+def process_pdf(extractor: "DocumentExtractor", pdf: Path, page_plan: list, pngs: list[Path]):
+    """Extract each rendered page with its own fields; write per-page and merged JSON."""
     if not pngs:
         print(f"❌ No images rendered for {pdf.name}")
         return
 
+    all_page_results: list[dict] = []
     # Extract per page with its own requested fields
     for (page_index, fields), png in zip(page_plan, pngs):
         print(f"🔎 Extracting {png.name} (page {page_index + 1}) …")
         try:
             result = extract_fields_from_image(extractor, png, fields)
+            filled = filled_count(result, fields)
+            if HIGH_DPI_FALLBACK and filled * 2 < len(fields):
+                # Mostly empty at DPI: retry this page at HIGH_DPI, keep whichever found more
+                print(f"🔁 Only {filled}/{len(fields)} fields; retrying page {page_index + 1} at {HIGH_DPI} DPI …")
+                hi_png = render_pages_to_png(pdf, png.parent, HIGH_DPI, [page_index])[0]
+                retry = extract_fields_from_image(extractor, hi_png, fields)
+                if filled_count(retry, fields) > filled:
+                    result = retry
             all_page_results.append(result)
 
             # Write per-page result WITH wrapper (useful for debugging)
@@ -134,12 +161,42 @@ def main():
     if not INPUT_DIR.exists():
         print(f"❌ Input folder not found: {INPUT_DIR}")
         return
+    from docstrange import DocumentExtractor
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     print("▶ Local mode (cpu=True) with Ollama; high DPI on CPU. This can take a bit…")
     extractor = DocumentExtractor(cpu=True)
 
-    pdfs = sorted(p for p in INPUT_DIR.glob("*.pdf") if p.is_file())
-    for pdf in pdfs:
-        process_pdf(extractor, pdf)
+    # One directory listing (no per-file stat on the synced folder)
+    with os.scandir(INPUT_DIR) as it:
+        entries = sorted((e for e in it if e.name.lower().endswith(".pdf") and e.is_file()),
+                         key=lambda e: e.name.lower())
+    queued = []
+    for e in entries:
+        pdf = Path(e.path)
+        page_plan = page_plan_for(pdf)
+        if page_plan:
+            queued.append((pdf, page_plan))
+
+    # Render/extract pipeline: every PDF's pages are rasterized in worker processes while the
+    # extractor (CPU/Ollama, one at a time) works through the PDFs in order.
+    # Page PNGs are scratch input for DocStrange (it reads a file path); keep them off the synced folder
+    with tempfile.TemporaryDirectory(prefix="docstrange_") as tmp, \
+            ProcessPoolExecutor(max_workers=RENDER_WORKERS) as pool:
+        png_dir = OUTPUT_DIR if KEEP_PNGS else Path(tmp)
+        renders = [pool.submit(render_pages_to_png, pdf, png_dir, DPI, [p for p, _ in page_plan])
+                   for pdf, page_plan in queued]
+        for (pdf, page_plan), render in zip(queued, renders):
+            print(f"🖼️  Rendering {pdf.name} at {DPI} DPI …")
+            try:
+                pngs = render.result()
+            except Exception as e:
+                print(f"❌ Could not render {pdf.name}: {e}")
+                continue
+            process_pdf(extractor, pdf, page_plan, pngs)
+            if not KEEP_PNGS:
+                for png in pngs:
+                    png.unlink(missing_ok=True)
 
     print("🎉 Done.")
 
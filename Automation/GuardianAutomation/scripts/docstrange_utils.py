@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Shared helpers for the DocStrange cloud scripts (docstrange_cloud_pull.py, docstrange_cloud_schema_pull.py):
+- JSON text via orjson when installed (stdlib json otherwise)
+- Result cache in <out_dir>/.cache/{hash}.json keyed by PDF bytes + what was requested,
+  so re-runs skip the cloud call
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+# orjson (optional) serializes the per-PDF dumps much faster than stdlib json
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+def json_text(data, indent=True) -> str:
+    """JSON as str (2-space indent unless indent=False); write it with write_text(..., encoding="utf-8")."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=(orjson.OPT_INDENT_2 if indent else 0) | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; let stdlib handle it
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None)
+
+def cache_key(pdf: Path, request) -> str:
+    """blake2b of the PDF bytes plus the requested fields/schema (a changed request is a new entry)."""
+    h = hashlib.blake2b(pdf.read_bytes(), digest_size=16)
+    h.update(json.dumps(request, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+def cache_load(out_dir, key: str):
+    """Cached result for key, or None if missing/unreadable."""
+    try:
+        raw = Path(out_dir, ".cache", f"{key}.json").read_bytes()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except (OSError, ValueError):
+        return None
+
+def cache_store(out_dir, key: str, value) -> None:
+    cache_dir = Path(out_dir, ".cache")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cache_dir / f"{key}.{threading.get_ident()}.tmp"
+    tmp.write_text(json_text(value, indent=False), encoding="utf-8")
+    os.replace(tmp, cache_dir / f"{key}.json")  # atomic: readers never see a partial file